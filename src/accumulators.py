@@ -0,0 +1,179 @@
+"""
+Streaming accumulators for computing statistics in a single pass.
+
+Each accumulator has an add(value) method called once per value, in the
+same pass over the data, and exposes its results as attributes or methods.
+"""
+
+import math
+from array import array
+
+from src.stats import median, mode, variance
+
+
+class SumAccumulator:
+    """Count and running total of the values, summed in input order."""
+
+    __slots__ = ('count', 'total')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+
+    def add(self, value):
+        """Add a value."""
+        self.count += 1
+        self.total += value
+
+    def mean(self):
+        """Return the arithmetic mean (same result as stats.mean)."""
+        return self.total / self.count
+
+
+class MinMaxAccumulator:
+    """
+    Smallest and largest value seen.
+
+    NaN values are skipped wherever they appear: NaN compares false with
+    every number, so it is only checked for until the first other value
+    (minimum and maximum stay None while only NaN was added).
+    """
+
+    __slots__ = ('minimum', 'maximum')
+
+    def __init__(self):
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value):
+        """Add a value."""
+        if self.minimum is None:
+            if not math.isnan(value):
+                self.minimum = self.maximum = value
+        elif value < self.minimum:
+            self.minimum = value
+        elif value > self.maximum:
+            self.maximum = value
+
+    def range(self):
+        """Return the difference between the largest and smallest value."""
+        return self.maximum - self.minimum
+
+
+class MomentAccumulator:
+    """
+    Central moment accumulator (up to the 4th moment).
+
+    Uses the numerically stable online update of Welford, extended by
+    Terriberry to the 3rd and 4th moments:
+
+    delta = x - mean
+    mean += delta / n
+    M4 += delta^4 (n-1)(n^2-3n+3)/n^3 + 6 delta^2 M2/n^2 - 4 delta M3/n
+    M3 += delta^3 (n-1)(n-2)/n^2 - 3 delta M2/n
+    M2 += delta^2 (n-1)/n
+    """
+
+    __slots__ = ('count', 'mean', 'm2', 'm3', 'm4')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+
+    def add(self, value):
+        """Add a value."""
+        previous_count = self.count
+        self.count += 1
+        n = self.count
+
+        delta = value - self.mean
+        delta_n = delta / n
+        delta_n2 = delta_n * delta_n
+        term = delta * delta_n * previous_count
+
+        self.mean += delta_n
+        self.m4 += term * delta_n2 * (n * n - 3 * n + 3) + 6 * delta_n2 * self.m2 \
+            - 4 * delta_n * self.m3
+        self.m3 += term * delta_n * (n - 2) - 3 * delta_n * self.m2
+        self.m2 += term
+
+    def skewness(self):
+        """
+        Population skewness: m3 / m2^(3/2).
+
+        Returns None when all values are equal.
+        """
+        if not self.m2:
+            return None
+        return self.count ** 0.5 * self.m3 / self.m2 ** 1.5
+
+    def kurtosis(self):
+        """
+        Population excess kurtosis: m4 / m2^2 - 3.
+
+        Returns None when all values are equal.
+        """
+        if not self.m2:
+            return None
+        return self.count * self.m4 / (self.m2 * self.m2) - 3
+
+
+class HistogramAccumulator:
+    """
+    Fixed-width histogram over a known range [low, high].
+
+    Values outside the range (including NaN and infinities) are not
+    counted; high falls in the last bin.
+    """
+
+    __slots__ = ('low', 'high', 'width', 'counts')
+
+    def __init__(self, bins, low, high):
+        if bins < 1:
+            raise ValueError(f"Number of histogram bins must be at least 1: {bins}")
+        self.low = low
+        self.high = high
+        self.width = (high - low) / bins
+        self.counts = [0] * bins
+
+    def add(self, value):
+        """Add a value."""
+        # Written as a single chained comparison so NaN is skipped as well
+        if not self.low <= value <= self.high:
+            return
+        if not self.width:
+            self.counts[0] += 1
+            return
+        index = min(int((value - self.low) / self.width), len(self.counts) - 1)
+        self.counts[index] += 1
+
+    def add_all(self, values):
+        """Add every value of an iterable."""
+        for value in values:
+            self.add(value)
+
+
+class ValueStore:
+    """Compact in-memory copy of the values, for order statistics."""
+
+    __slots__ = ('values', 'add')
+
+    def __init__(self):
+        self.values = array('d')
+        # Bound straight to the array, saving a method call per value
+        self.add = self.values.append
+
+    def median(self):
+        """Return the median (same result as stats.median)."""
+        return median(self.values)
+
+    def mode(self):
+        """Return the mode (same result as stats.mode)."""
+        return mode(self.values)
+
+    def variance(self):
+        """Return the population variance (same result as stats.variance)."""
+        return variance(self.values)
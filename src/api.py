@@ -0,0 +1,396 @@
+"""
+In-process API for the statistics, conversion and word count programs.
+
+Unlike the command line scripts, these functions work on data already in
+memory: iterables of numbers or lines, str/bytes buffers, memoryviews and
+arrays. Only str, bytes and bytearray are read as text; arrays and
+memoryviews always hold numbers, whatever their item format. Results are
+returned as slotted dataclasses.
+"""
+
+import io
+import math
+import time
+from array import array
+from dataclasses import dataclass, field
+
+from src.converters import (
+    decimal_to_binary,
+    decimal_to_hexadecimal,
+    to_fixed_width,
+)
+from src.accumulators import (
+    HistogramAccumulator,
+    MinMaxAccumulator,
+    MomentAccumulator,
+    SumAccumulator,
+    ValueStore,
+)
+from src.utils import READ_BUFFER_SIZE, iter_chunks, iter_values, parse_values
+from src.word_counter import WordCounts, count_word_bytes, count_word_lines
+
+
+STATISTICS_METRICS = (
+    'Count', 'Mean', 'Median', 'Mode', 'Var', 'Std',
+    'Min', 'Max', 'Range', 'Hist', 'Skew', 'Kurt',
+)
+DEFAULT_STATISTICS = ('Count', 'Mean', 'Median', 'Mode', 'Var', 'Std')
+# Metrics needing every value in memory (sorting, counting or a second pass)
+STORED_METRICS = ('Median', 'Mode', 'Var', 'Std')
+DEFAULT_BINS = 10
+
+
+@dataclass(slots=True, frozen=True)
+class StatisticsOptions:
+    """
+    Metrics to compute for a data set (P1).
+
+    metrics are names from STATISTICS_METRICS; bins and the optional
+    (low, high) hist_range configure Hist.
+    """
+
+    metrics: tuple = DEFAULT_STATISTICS
+    bins: int = DEFAULT_BINS
+    hist_range: tuple | None = None
+
+
+@dataclass(slots=True)
+class StatisticsResult:  # pylint: disable=too-many-instance-attributes
+    """
+    Descriptive statistics of a data set (P1), one field per metric.
+
+    Metrics that were not requested are left as None.
+    """
+
+    count: int | None = None
+    mean: float | None = None
+    median: float | None = None
+    mode: float | None = None
+    var: float | None = None
+    std: float | None = None
+    min: float | None = None
+    max: float | None = None
+    range: float | None = None
+    hist: list | None = None
+    skew: float | None = None
+    kurt: float | None = None
+    time: float = 0.0
+
+
+@dataclass(slots=True)
+class Conversion:
+    """A decimal number with its binary and hexadecimal representations (P2)."""
+
+    decimal: int
+    binary: str
+    hexadecimal: str
+
+
+@dataclass(slots=True)
+class ConversionResult:
+    """
+    Conversions of a data set (P2), stored as parallel columns.
+
+    width is the two's complement width in bits, or None for signed
+    representations.
+    """
+
+    decimals: list = field(default_factory=list)
+    binaries: list = field(default_factory=list)
+    hexadecimals: list = field(default_factory=list)
+    width: int | None = None
+    time: float = 0.0
+
+    @property
+    def conversions(self):
+        """List of Conversion rows."""
+        return list(map(Conversion, self.decimals, self.binaries, self.hexadecimals))
+
+
+@dataclass(slots=True)
+class WordCountResult:
+    """Word frequencies of a text (P3)."""
+
+    frequencies: WordCounts = field(default_factory=WordCounts)
+    total: int = 0
+    time: float = 0.0
+
+
+def to_int(value):
+    """
+    Convert a line or number to an integer.
+
+    Integer lines are parsed exactly with int(), so values above 2^53 keep
+    every digit. Only decimal lines ('3.7', '1e3') go through float and are
+    truncated toward zero. Infinite values are rejected with a ValueError.
+    """
+    try:
+        return int(value)
+    except (ValueError, OverflowError):
+        number = float(value)
+        if not math.isfinite(number):
+            raise ValueError(f"Not a finite number: {value}") from None
+        return int(number)
+
+
+def is_text_buffer(source):
+    """
+    Return True if source holds encoded text rather than numbers.
+
+    Only bytes and bytearray are text. A memoryview is numeric like the
+    array it views, so memoryview(array('B', [1, 2])) loads the numbers
+    1 and 2; pass bytes(view) to read a view of encoded text.
+    """
+    return isinstance(source, (bytes, bytearray))
+
+
+def load_values(source, converter=float, policy=None, name='<data>'):
+    """
+    Load numeric values from an in-memory source.
+
+    Args:
+        source: Text (str, bytes or bytearray, one number per line), an
+            array or memoryview of numbers, or any iterable of numbers
+            and/or lines
+        converter: Function to convert each value (default: float)
+        policy: Optional invalid line policy (see utils.new_invalid_line_policy)
+        name: Name used for the source in warnings and errors
+
+    Returns:
+        List of converted values
+    """
+    return parse_values(source_items(source), converter, policy, name)
+
+
+def source_items(source):
+    """Return the lines or numbers of a source accepted by load_values."""
+    if is_text_buffer(source):
+        source = str(source, 'utf-8')
+    if isinstance(source, str):
+        return source.splitlines()
+    if isinstance(source, (array, memoryview)):
+        return source.tolist()
+    return source
+
+
+def iter_text_lines(source):
+    """
+    Iterate the lines of an in-memory text source.
+
+    Args:
+        source: str, text file object or iterable of lines
+
+    Returns:
+        Iterable of lines
+    """
+    if isinstance(source, str):
+        return io.StringIO(source)
+    return source
+
+
+def iter_byte_chunks(source):
+    """
+    Iterate an encoded text source as bytes chunks, or return None.
+
+    Args:
+        source: bytes, bytearray, memoryview or binary file object
+
+    Returns:
+        Iterable of bytes, or None if source is not binary
+    """
+    if isinstance(source, bytes):
+        return [source]
+    if isinstance(source, (bytearray, memoryview)):
+        view = memoryview(source).cast('B')
+        return (bytes(view[start:start + READ_BUFFER_SIZE])
+                for start in range(0, len(view), READ_BUFFER_SIZE))
+    if isinstance(source, (io.RawIOBase, io.BufferedIOBase)):
+        return iter_chunks(source)
+    return None
+
+
+def plan_accumulators(options):
+    """
+    Create the accumulators needed for the requested metrics.
+
+    Without options.hist_range the histogram spans the data's min and
+    max, so values are stored and binned in a second pass.
+
+    Args:
+        options: StatisticsOptions
+
+    Returns:
+        Dictionary of accumulator name to accumulator
+    """
+    metrics = options.metrics
+    unknown = [metric for metric in metrics if metric not in STATISTICS_METRICS]
+    if unknown:
+        raise ValueError(f"Unknown metric(s): {', '.join(unknown)}")
+    if 'Hist' in metrics and options.bins < 1:
+        raise ValueError(f"Number of histogram bins must be at least 1: {options.bins}")
+
+    stored_hist = 'Hist' in metrics and options.hist_range is None
+    plan = {'sum': SumAccumulator()}
+    if any(metric in STORED_METRICS for metric in metrics) or stored_hist:
+        plan['values'] = ValueStore()
+    if any(metric in ('Min', 'Max', 'Range') for metric in metrics) or stored_hist:
+        plan['minmax'] = MinMaxAccumulator()
+    if 'Skew' in metrics or 'Kurt' in metrics:
+        plan['moments'] = MomentAccumulator()
+    if 'Hist' in metrics and options.hist_range is not None:
+        plan['hist'] = HistogramAccumulator(options.bins, *options.hist_range)
+
+    return plan
+
+
+def compute_statistics_from(source, policy=None, name='<data>', options=None):
+    """
+    Compute descriptive statistics of in-memory data in a single pass.
+
+    Only the accumulators needed by the requested metrics are updated,
+    and the values are only kept in memory for Median, Mode, Var, Std
+    and Hist without a range. Hist without a range is the exception to
+    the single pass: its bins depend on the data's min and max, so the
+    stored values are binned in a second pass once those are known.
+
+    Args:
+        source: Data accepted by load_values
+        policy: Optional invalid line policy
+        name: Name used for the source in warnings and errors
+        options: Optional StatisticsOptions (default: DEFAULT_STATISTICS)
+
+    Returns:
+        StatisticsResult
+    """
+    start_time = time.time()
+    options = options or StatisticsOptions()
+    plan = plan_accumulators(options)
+
+    updates = [accumulator.add for accumulator in plan.values()]
+    if len(updates) == 1:
+        add = updates[0]
+        for value in iter_values(source_items(source), float, policy, name):
+            add(value)
+    else:
+        for value in iter_values(source_items(source), float, policy, name):
+            for add in updates:
+                add(value)
+
+    if not plan['sum'].count:
+        raise ValueError(f"File is empty or contains no valid data: {name}")
+
+    result = StatisticsResult()
+    collect_statistics(result, plan, options)
+    result.time = time.time() - start_time
+
+    return result
+
+
+def collect_statistics(result, plan, options):
+    """Fill a StatisticsResult with the requested metrics from the accumulators."""
+    metrics = options.metrics
+    values = plan.get('values')
+    minmax = plan.get('minmax')
+    moments = plan.get('moments')
+    if minmax is not None and minmax.minimum is None:
+        # Only NaN values were seen
+        minmax.minimum = minmax.maximum = math.nan
+
+    if 'Count' in metrics:
+        result.count = plan['sum'].count
+    if 'Mean' in metrics:
+        result.mean = plan['sum'].mean()
+    if 'Median' in metrics:
+        result.median = values.median()
+    if 'Mode' in metrics:
+        result.mode = values.mode()
+    if 'Var' in metrics or 'Std' in metrics:
+        var = values.variance()
+        result.var = var if 'Var' in metrics else None
+        result.std = var ** 0.5 if 'Std' in metrics else None
+    if 'Min' in metrics:
+        result.min = minmax.minimum
+    if 'Max' in metrics:
+        result.max = minmax.maximum
+    if 'Range' in metrics:
+        result.range = minmax.range()
+    if 'Skew' in metrics:
+        result.skew = moments.skewness()
+    if 'Kurt' in metrics:
+        result.kurt = moments.kurtosis()
+    if 'Hist' in metrics:
+        result.hist = histogram_counts(plan, options.bins)
+
+
+def histogram_counts(plan, bins):
+    """
+    Return the histogram counts, binning the stored values if no range was given.
+
+    Without a range the histogram spans the data's finite min and max;
+    NaN and infinite values are never counted.
+    """
+    histogram = plan.get('hist')
+    if histogram is not None:
+        return histogram.counts
+
+    values = plan['values'].values
+    low, high = plan['minmax'].minimum, plan['minmax'].maximum
+    if not (math.isfinite(low) and math.isfinite(high)):
+        finite = [value for value in values if math.isfinite(value)]
+        low, high = (min(finite), max(finite)) if finite else (0.0, 0.0)
+
+    histogram = HistogramAccumulator(bins, low, high)
+    histogram.add_all(values)
+    return histogram.counts
+
+
+def convert_numbers_from(source, policy=None, name='<data>', width=None):
+    """
+    Convert in-memory numbers to binary and hexadecimal.
+
+    Args:
+        source: Data accepted by load_values
+        policy: Optional invalid line policy
+        name: Name used for the source in warnings and errors
+        width: Optional two's complement width (8, 16, 32 or 64 bits); the
+            whole data set is then converted in bulk to zero-padded strings,
+            with OVERFLOW for numbers that do not fit
+
+    Returns:
+        ConversionResult
+    """
+    start_time = time.time()
+    data = load_values(source, to_int, policy, name)
+
+    if width is None:
+        binaries = list(map(decimal_to_binary, data))
+        hexadecimals = list(map(decimal_to_hexadecimal, data))
+    else:
+        binaries, hexadecimals = to_fixed_width(data, width)
+
+    return ConversionResult(data, binaries, hexadecimals, width, time.time() - start_time)
+
+
+def count_words_from(source):
+    """
+    Count word frequencies of in-memory text.
+
+    Args:
+        source: Encoded text accepted by iter_byte_chunks (counted at the
+            byte level) or text accepted by iter_text_lines
+
+    Returns:
+        WordCountResult with a compact WordCounts store
+    """
+    start_time = time.time()
+    chunks = iter_byte_chunks(source)
+    if chunks is not None:
+        frequencies = count_word_bytes(chunks)
+    else:
+        frequencies = count_word_lines(iter_text_lines(source))
+
+    return WordCountResult(
+        frequencies=frequencies,
+        total=frequencies.total(),
+        time=time.time() - start_time,
+    )
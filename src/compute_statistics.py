@@ -1,88 +1,149 @@
 """Main script to compute statistics from a file."""
 
-import sys
-import time
+import argparse
 import os
+from functools import partial
 
-from src.stats import count, mean, median, mode, variance, standard_deviation
-from src.utils import read_data, save_results, print_results, print_skipped_files, get_output_path
+from src.api import (
+    DEFAULT_BINS,
+    DEFAULT_STATISTICS,
+    STATISTICS_METRICS,
+    StatisticsOptions,
+    compute_statistics_from,
+)
+from src.utils import Script, collect_file_results, open_input, run_main
 
 RESULTS_DIR = os.path.join(os.path.dirname(__file__), '..', 'results', 'p1')
 METRICS = ['Count', 'Mean', 'Median', 'Mode', 'Var', 'Std', 'Time']
+USAGE = "Usage: python -m src.compute_statistics <input1> [input2] ... [options]"
 
 
-def compute_statistics(filepath):
-    """Compute statistics for a single file and return results."""
-    start_time = time.time()
-    data = read_data(filepath, converter=float)
+def parse_metrics(spec):
+    """Parse a comma-separated list of metric names (Time is always reported)."""
+    metrics = tuple(name.strip() for name in spec.split(',') if name.strip())
+    unknown = [metric for metric in metrics if metric not in STATISTICS_METRICS]
+    if unknown or not metrics:
+        raise argparse.ArgumentTypeError(
+            f"invalid metrics '{spec}', choose from {','.join(STATISTICS_METRICS)}"
+        )
+    return metrics
 
-    results = {
-        'Count': count(data),
-        'Mean': mean(data),
-        'Median': median(data),
-        'Mode': mode(data),
-        'Var': variance(data),
-        'Std': standard_deviation(data),
-    }
 
-    elapsed_time = time.time() - start_time
-    results['Time'] = f"{elapsed_time:.6f}"
+def parse_hist_range(spec):
+    """Parse a histogram range of the form 'low:high'."""
+    try:
+        low, high = (float(part) for part in spec.split(':'))
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"invalid range '{spec}', expected low:high") from e
 
-    return results
+    if not low < high:
+        raise argparse.ArgumentTypeError(f"invalid range '{spec}', expected low < high")
 
+    return low, high
 
-def process_files(filepaths):
-    """Process multiple files and return results with valid filenames."""
-    all_results = []
-    valid_filenames = []
-    skipped_files = []
 
-    for filepath in filepaths:
-        try:
-            all_results.append(compute_statistics(filepath))
-            valid_filenames.append(os.path.basename(filepath))
-        except (FileNotFoundError, ValueError) as e:
-            print(f"Warning: Skipping file - {e}")
-            skipped_files.append(filepath)
+def parse_bins(spec):
+    """Parse a number of histogram bins (at least 1)."""
+    try:
+        bins = int(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"invalid bins '{spec}', expected an integer") from e
 
-    return all_results, valid_filenames, skipped_files
+    if bins < 1:
+        raise argparse.ArgumentTypeError(f"invalid bins '{spec}', expected at least 1")
 
+    return bins
 
-def format_results(all_results, valid_filenames):
-    """Format results as tab-separated lines."""
-    output_lines = []
-    header_line = '\t'.join([''] + valid_filenames)
-    output_lines.append(header_line)
 
-    for metric in METRICS:
-        row = [metric] + [str(results[metric]) for results in all_results]
-        output_lines.append('\t'.join(row))
+EXTRA_ARGUMENTS = [
+    (('--metrics',), {
+        'dest': 'metrics', 'type': parse_metrics, 'default': DEFAULT_STATISTICS,
+        'help': f"comma-separated metrics to compute ({','.join(STATISTICS_METRICS)})",
+    }),
+    (('--bins',), {
+        'dest': 'bins', 'type': parse_bins, 'default': DEFAULT_BINS,
+        'help': 'number of histogram bins (Hist metric)',
+    }),
+    (('--hist-range',), {
+        'dest': 'hist_range', 'type': parse_hist_range, 'default': None,
+        'help': 'histogram range low:high (default: each file\'s min and max)',
+    }),
+]
 
-    return output_lines
 
+def compute_statistics(filepath, policy=None, binary_file=None, options=None):
+    """Compute statistics for a single file and return a StatisticsResult."""
+    with open_input(filepath, binary_file) as file:
+        return compute_statistics_from(file, policy, filepath, options)
 
-def main():
-    """Main entry point."""
-    if len(sys.argv) < 2:
-        print("Usage: python -m compute_statistics <filepath1> [filepath2] ...")
-        sys.exit(1)
 
-    filepaths = sys.argv[1:]
-    all_results, valid_filenames, skipped_files = process_files(filepaths)
+def format_metric(results, metric):
+    """Format a single metric of a StatisticsResult."""
+    value = getattr(results, metric.lower())
+    if metric == 'Time':
+        return f"{value:.6f}"
+    if isinstance(value, list):
+        return ','.join(str(item) for item in value)
+    return str(value)
+
+
+def process_files(filepaths, policy=None, jobs=1, prefetch=0, **options):
+    """
+    Process multiple files and return results.
+
+    The metrics, bins and hist_range keyword arguments (the --metrics,
+    --bins and --hist-range options) are passed on as StatisticsOptions.
+    """
+    options = StatisticsOptions(**options)
+    task_fn = partial(compute_statistics, policy=policy, options=options)
+    all_results, skipped_files = collect_file_results(task_fn, filepaths, jobs, prefetch)
+    for file_data in all_results:
+        file_data['metrics'] = list(options.metrics) + ['Time']
+
+    return all_results, skipped_files
+
 
-    if not all_results:
-        print("Error: No valid files to process")
-        sys.exit(1)
+def format_file(file_data):
+    """Format the statistics of one file as 'metric<TAB>value' lines."""
+    metrics = file_data.get('metrics', METRICS)
+    return [f"{metric}\t{format_metric(file_data['results'], metric)}" for metric in metrics]
 
-    output_lines = format_results(all_results, valid_filenames)
 
-    print_results(output_lines)
+def combine_results(filenames, columns):
+    """
+    Combine per-file 'metric<TAB>value' lines into one tab-separated table.
 
-    base_output_path = os.path.join(RESULTS_DIR, "StatisticsResults.txt")
-    output_path = get_output_path(base_output_path, filepaths)
-    save_results(output_lines, output_path)
+    Raises:
+        ValueError: If the files do not report the same metrics in the same order
+    """
+    columns = [[line.split('\t', 1) for line in column] for column in columns]
+    metrics = [metric for metric, _ in columns[0]] if columns else []
+    for filename, column in zip(filenames, columns):
+        if [metric for metric, _ in column] != metrics:
+            raise ValueError(f"Metrics of {filename} do not match those of {filenames[0]}")
 
-    print_skipped_files(skipped_files)
+    output_lines = []
+    header_line = '\t'.join([''] + filenames)
+    output_lines.append(header_line)
+
+    for row_index, metric in enumerate(metrics):
+        row = [metric] + [column[row_index][1] for column in columns]
+        output_lines.append('\t'.join(row))
+
+    return output_lines
+
+
+def main():
+    """Main entry point."""
+    run_main(Script(
+        usage=USAGE,
+        process_fn=process_files,
+        format_file_fn=format_file,
+        combine_fn=combine_results,
+        output_path=os.path.join(RESULTS_DIR, "StatisticsResults.txt"),
+        invalid_lines=True,
+        extra_arguments=EXTRA_ARGUMENTS,
+    ))
 
 
 if __name__ == '__main__':
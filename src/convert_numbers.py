@@ -1,67 +1,51 @@
 """Script to convert numbers from decimal to binary and hexadecimal."""
 
-import time
 import os
+from functools import partial
 
-from src.converters import decimal_to_binary, decimal_to_hexadecimal
-from src.utils import read_data, run_main
+from src.api import convert_numbers_from
+from src.converters import TWOS_COMPLEMENT_WIDTHS
+from src.utils import Script, collect_file_results, open_input, run_main
 
 RESULTS_DIR = os.path.join(os.path.dirname(__file__), '..', 'results', 'p2')
 
+EXTRA_ARGUMENTS = [
+    (('--width',), {
+        'dest': 'width', 'type': int, 'choices': TWOS_COMPLEMENT_WIDTHS, 'default': None,
+        'help': "write zero-padded two's complement of this many bits",
+    }),
+]
 
-def to_int(value):
-    """Convert string to integer (via float for decimal support)."""
-    return int(float(value))
+ROW_FORMAT = "{}\t{}\t{}".format
 
 
-def convert_numbers(filepath):
-    """Convert all numbers in a file to binary and hexadecimal."""
-    start_time = time.time()
-    data = read_data(filepath, converter=to_int)
+def convert_numbers(filepath, policy=None, binary_file=None, width=None):
+    """Convert all numbers in a file to binary and hexadecimal (ConversionResult)."""
+    with open_input(filepath, binary_file) as file:
+        return convert_numbers_from(file, policy, filepath, width)
 
-    results = []
-    for number in data:
-        results.append({
-            'Decimal': number,
-            'Binary': decimal_to_binary(number),
-            'Hexadecimal': decimal_to_hexadecimal(number),
-        })
 
-    elapsed_time = time.time() - start_time
+def process_files(filepaths, policy=None, jobs=1, prefetch=0, width=None):
+    """Process multiple files and return results."""
+    task_fn = partial(convert_numbers, policy=policy, width=width)
+    return collect_file_results(task_fn, filepaths, jobs, prefetch)
 
-    return results, elapsed_time
 
+def format_file(file_data):
+    """Format the conversions of one file as tab-separated lines."""
+    result = file_data['results']
+    output_lines = ["", f"# {file_data['filename']}"]
+    output_lines.extend(map(ROW_FORMAT, result.decimals, result.binaries, result.hexadecimals))
+    output_lines.append(f"# Time: {result.time:.6f} seconds")
 
-def process_files(filepaths):
-    """Process multiple files and return results."""
-    all_results = []
-    skipped_files = []
-
-    for filepath in filepaths:
-        try:
-            results, elapsed_time = convert_numbers(filepath)
-            all_results.append({
-                'filename': os.path.basename(filepath),
-                'results': results,
-                'time': elapsed_time,
-            })
-        except (FileNotFoundError, ValueError) as e:
-            print(f"Warning: Skipping file - {e}")
-            skipped_files.append(filepath)
-
-    return all_results, skipped_files
-
-
-def format_results(all_results):
-    """Format results as tab-separated lines."""
-    output_lines = []
-    output_lines.append("Decimal\tBinary\tHexadecimal")
-
-    for file_data in all_results:
-        output_lines.append(f"\n# {file_data['filename']}")
-        for row in file_data['results']:
-            output_lines.append(f"{row['Decimal']}\t{row['Binary']}\t{row['Hexadecimal']}")
-        output_lines.append(f"# Time: {file_data['time']:.6f} seconds")
+    return output_lines
+
+
+def combine_results(_filenames, blocks):
+    """Combine per-file conversion lines under a common header."""
+    output_lines = ["Decimal\tBinary\tHexadecimal"]
+    for block in blocks:
+        output_lines.extend(block)
 
     return output_lines
 
@@ -69,12 +53,15 @@ def format_results(all_results):
 def main():
     """Main entry point."""
     output_path = os.path.join(RESULTS_DIR, "ConversionResults.txt")
-    run_main(
-        usage="Usage: python -m src.convert_numbers <filepath1> [filepath2] ...",
-        format_fn=format_results,
+    run_main(Script(
+        usage="Usage: python -m src.convert_numbers <input1> [input2] ... [options]",
         process_fn=process_files,
+        format_file_fn=format_file,
+        combine_fn=combine_results,
         output_path=output_path,
-    )
+        invalid_lines=True,
+        extra_arguments=EXTRA_ARGUMENTS,
+    ))
 
 
 if __name__ == '__main__':
@@ -1,5 +1,21 @@
 """Number conversion functions implementation."""
 
+import sys
+from array import array
+
+TWOS_COMPLEMENT_WIDTHS = (8, 16, 32, 64)
+OVERFLOW = 'OVERFLOW'
+
+# Byte translation tables used to expand hexadecimal digits into bits in
+# bulk: a hex digit becomes a byte whose own hex digits are the digit's two
+# 2-bit halves, and a 2-bit digit becomes a byte whose hex digits are bits.
+HEX_TO_PAIRS = bytes.maketrans(
+    b'0123456789abcdef', bytes(((n >> 2) << 4) | (n & 3) for n in range(16))
+)
+PAIRS_TO_BITS = bytes.maketrans(
+    b'0123', bytes(((n >> 1) << 4) | (n & 1) for n in range(4))
+)
+
 
 def decimal_to_binary(number):
     """
@@ -79,3 +95,112 @@ def decimal_to_hexadecimal(number):
         result = '-' + result
 
     return result
+
+
+def get_typecodes(width):
+    """Return the (signed, unsigned) array typecodes of width-bit integers."""
+    for signed_code in 'bhilq':
+        if array(signed_code).itemsize * 8 == width:
+            return signed_code, signed_code.upper()
+    raise ValueError(f"Unsupported width: {width}")
+
+
+def low_bytes(wide, size):
+    """
+    Keep the low size bytes of every item of a native 64-bit array.
+
+    The bytes are gathered with one strided slice assignment per kept byte
+    offset, so the cost does not depend on Python code per item.
+    """
+    raw = wide.tobytes()
+    first = 0 if sys.byteorder == 'little' else wide.itemsize - size
+    out = bytearray(len(wide) * size)
+    for offset in range(size):
+        out[offset::size] = raw[first + offset::wide.itemsize]
+    return out
+
+
+def twos_complement(numbers, width):
+    """
+    Get the width-bit two's complement bit patterns of numbers in bulk.
+
+    Numbers from -2^(width-1) to 2^width - 1 fit, so both signed and
+    unsigned values are accepted. When every number fits the signed range
+    the numbers are packed into a signed array whose bytes are read back
+    as an unsigned array. Otherwise the numbers are packed into a 64-bit
+    array and the low width/8 bytes of each item are kept, which is still
+    done without per-number Python code.
+
+    -1 (8 bits) -> 255 -> 11111111
+    -128 (8 bits) -> 128 -> 10000000
+    200 (8 bits) -> 200 -> 11001000
+
+    Args:
+        numbers: Sequence of integers
+        width: Number of bits (8, 16, 32 or 64)
+
+    Returns:
+        Tuple (unsigned array of bit patterns, indices of numbers out of range)
+    """
+    signed_code, unsigned_code = get_typecodes(width)
+    try:
+        return array(unsigned_code, array(signed_code, numbers).tobytes()), []
+    except OverflowError:
+        pass
+
+    low = -(1 << (width - 1))
+    high = (1 << width) - 1
+    overflows = []
+    if min(numbers) < low or max(numbers) > high:
+        overflows = [index for index, number in enumerate(numbers)
+                     if not low <= number <= high]
+        numbers = list(numbers)
+        for index in overflows:
+            numbers[index] = 0
+
+    if width < 64:
+        return array(unsigned_code, low_bytes(array('q', numbers), width // 8)), overflows
+    try:
+        return array(unsigned_code, numbers), overflows
+    except OverflowError:
+        # Negative numbers mixed with numbers of 2^63 and above
+        return array(unsigned_code, map(high.__and__, numbers)), overflows
+
+
+def to_fixed_width(numbers, width):
+    """
+    Convert numbers to zero-padded width-bit two's complement strings.
+
+    The whole data set is converted at once: the bit patterns are written
+    out as big-endian bytes, bytes.hex() gives the hexadecimal digits of
+    every number, and two more hex/translate passes expand each digit
+    into its four bits.
+
+    to_fixed_width([5, -5], 8) => (['00000101', '11111011'], ['05', 'FB'])
+
+    Numbers out of range for the width are converted to OVERFLOW.
+
+    Args:
+        numbers: Sequence of integers
+        width: Number of bits (8, 16, 32 or 64)
+
+    Returns:
+        Tuple (binary strings, hexadecimal strings)
+    """
+    if not numbers:
+        return [], []
+
+    patterns, overflows = twos_complement(numbers, width)
+    if sys.byteorder == 'little':
+        patterns.byteswap()
+    raw = patterns.tobytes()
+
+    hexadecimals = raw.hex('\n', width // 8).upper().split('\n')
+    pairs = raw.hex().encode('ascii').translate(HEX_TO_PAIRS)
+    bits = pairs.hex().encode('ascii').translate(PAIRS_TO_BITS)
+    binaries = bits.hex('\n', width // 2).split('\n')
+
+    for index in overflows:
+        binaries[index] = hexadecimals[index] = OVERFLOW
+
+    return binaries, hexadecimals
@@ -1,88 +1,62 @@
 """Script to count words in files."""
 
-import time
 import os
 
-from src.word_counter import get_word_frequencies
-from src.utils import run_main
+from src.api import count_words_from
+from src.utils import Script, collect_file_results, open_input_binary, run_main
 
 RESULTS_DIR = os.path.join(os.path.dirname(__file__), '..', 'results', 'p3')
 
 
-def read_text(filepath):
-    """Read all text from a file."""
-    if not os.path.exists(filepath):
-        raise FileNotFoundError(f"File not found: {filepath}")
+def count_file_words(filepath, binary_file=None):
+    """
+    Count word frequencies in a file and return a WordCountResult.
 
-    with open(filepath, 'r', encoding='utf-8') as file:
-        text = file.read()
+    The file is tokenized as raw bytes; only distinct words are decoded.
+    """
+    with open_input_binary(filepath, binary_file) as file:
+        return count_words_from(file)
 
-    return text
 
-
-def count_file_words(filepath):
-    """Count word frequencies in a file and return results."""
-    start_time = time.time()
-    text = read_text(filepath)
-
-    frequencies = get_word_frequencies(text)
-
-    elapsed_time = time.time() - start_time
-
-    return frequencies, elapsed_time
-
-
-def process_files(filepaths):
+def process_files(filepaths, jobs=1, prefetch=0):
     """Process multiple files and return results."""
-    all_results = []
-    skipped_files = []
-
-    for filepath in filepaths:
-        try:
-            frequencies, elapsed_time = count_file_words(filepath)
-            all_results.append({
-                'filename': os.path.basename(filepath),
-                'frequencies': frequencies,
-                'time': elapsed_time,
-            })
-        except FileNotFoundError as e:
-            print(f"Warning: Skipping file - {e}")
-            skipped_files.append(filepath)
-
-    return all_results, skipped_files
+    return collect_file_results(count_file_words, filepaths, jobs, prefetch)
 
 
-def format_results(all_results):
-    """Format results as tab-separated lines."""
-    output_lines = []
+def format_file(file_data):
+    """
+    Format the word counts of one file as tab-separated lines.
 
-    for file_data in all_results:
-        output_lines.append(f"# {file_data['filename']}")
-        output_lines.append("Word\tCount")
+    Lines are yielded straight from the file's WordCounts store instead
+    of being collected into a list first.
+    """
+    yield f"# {file_data['filename']}"
+    yield "Word\tCount"
 
-        frequencies = file_data['frequencies']
-        total = 0
+    result = file_data['results']
+    yield from result.frequencies.iter_lines()
 
-        for word, count in frequencies.items():
-            output_lines.append(f"{word}\t{count}")
-            total += count
+    yield f"Total\t{result.total}"
+    yield f"Time\t{result.time:.6f}"
+    yield ""
 
-        output_lines.append(f"Total\t{total}")
-        output_lines.append(f"Time\t{file_data['time']:.6f}")
-        output_lines.append("")
 
-    return output_lines
+def combine_results(_filenames, blocks):
+    """Chain per-file word count lines."""
+    for block in blocks:
+        yield from block
 
 
 def main():
     """Main entry point."""
     output_path = os.path.join(RESULTS_DIR, "WordCountResults.txt")
-    run_main(
-        usage="Usage: python -m src.count_words <filepath1> [filepath2] ...",
+    run_main(Script(
+        usage="Usage: python -m src.count_words <input1> [input2] ... [options]",
         process_fn=process_files,
-        format_fn=format_results,
+        format_file_fn=format_file,
+        combine_fn=combine_results,
         output_path=output_path,
-    )
+    ))
 
 
 if __name__ == '__main__':
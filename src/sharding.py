@@ -0,0 +1,228 @@
+"""
+Sharded runs: split the inputs across nodes and merge their partial results.
+
+With --shard i/N a node only processes every N-th input (starting at the
+i-th) and writes a partial result file. Each partial records the position
+of its files in the full input list, so the merge step can rebuild the
+exact output a single-node run would produce. The run options and a
+digest of the full input list are recorded too, so partials of different
+runs are refused by the merge.
+
+Partial file format (one record per line, tab separated):
+
+    @shard  <i>  <N>
+    @output <result file name>
+    @options <name>=<value> ...
+    @inputs <input count>  <SHA-256 of the input paths>
+    @file   <input index>  <file name>
+    ><formatted output line>      (repeated)
+    @skipped <input index>  <filepath>
+"""
+
+import argparse
+import hashlib
+import os
+
+PAYLOAD_PREFIX = '>'
+PARTIAL_BUFFER_SIZE = 1024 * 1024
+
+
+def parse_shard(spec):
+    """
+    Parse a shard specification of the form 'i/N' (1 <= i <= N).
+
+    Returns:
+        Tuple (i, N)
+    """
+    try:
+        index, total = (int(part) for part in spec.split('/'))
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"invalid shard '{spec}', expected i/N") from e
+
+    if not 1 <= index <= total:
+        raise argparse.ArgumentTypeError(f"invalid shard '{spec}', expected 1 <= i <= N")
+
+    return index, total
+
+
+def select_shard(filepaths, shard):
+    """
+    Select the inputs processed by a shard.
+
+    Inputs are dealt round-robin, so every node picks the same files
+    given the same (deterministically ordered) input list.
+
+    Args:
+        filepaths: Full list of input filepaths
+        shard: Tuple (i, N)
+
+    Returns:
+        List of (input index, filepath) pairs for the shard
+    """
+    index, total = shard
+    return [
+        (position, filepath)
+        for position, filepath in enumerate(filepaths)
+        if position % total == index - 1
+    ]
+
+
+def get_partial_path(output_path, shard):
+    """Return the default partial result path for a shard."""
+    base, ext = os.path.splitext(output_path)
+    return f"{base}.shard{shard[0]}of{shard[1]}{ext}"
+
+
+def format_run_options(options):
+    """
+    Format the options of a run as a single 'name=value ...' string.
+
+    Lists and tuples are written the same way, so an option given on the
+    command line matches its default value.
+    """
+    return ' '.join(
+        f"{name}={','.join(map(str, value)) if isinstance(value, (list, tuple)) else value}"
+        for name, value in sorted(options.items())
+    )
+
+
+def describe_inputs(filepaths):
+    """Return (input count, SHA-256 hex digest of the input paths) for a run."""
+    digest = hashlib.sha256()
+    for filepath in filepaths:
+        digest.update(filepath.encode('utf-8', 'surrogateescape') + b'\0')
+    return len(filepaths), digest.hexdigest()
+
+
+def new_partial_header(shard, output_name, options=None, filepaths=()):
+    """
+    Describe the run a partial result file belongs to.
+
+    Args:
+        shard: Tuple (i, N)
+        output_name: File name of the merged result
+        options: Dictionary of the script specific options of the run
+        filepaths: Full list of input filepaths of the run
+
+    Returns:
+        Dictionary with the shard, output name, options and inputs
+        (see format_run_options and describe_inputs)
+    """
+    return {
+        'shard': shard,
+        'output': output_name,
+        'options': format_run_options(options or {}),
+        'inputs': describe_inputs(filepaths),
+    }
+
+
+def write_partial(partial_path, header, records, skipped_files):
+    """
+    Write a partial result file.
+
+    Args:
+        partial_path: Path of the partial result file
+        header: Description of the run (see new_partial_header)
+        records: Iterable of (input index, filename, output lines) tuples
+        skipped_files: List of (input index, filepath) pairs
+    """
+    shard = header['shard']
+    os.makedirs(os.path.dirname(os.path.abspath(partial_path)), exist_ok=True)
+    with open(partial_path, 'w', encoding='utf-8', buffering=PARTIAL_BUFFER_SIZE) as file:
+        file.write(f"@shard\t{shard[0]}\t{shard[1]}\n")
+        file.write(f"@output\t{header['output']}\n")
+        file.write(f"@options\t{header['options']}\n")
+        file.write(f"@inputs\t{header['inputs'][0]}\t{header['inputs'][1]}\n")
+        for position, filename, lines in records:
+            file.write(f"@file\t{position}\t{filename}\n")
+            for line in lines:
+                file.write(f"{PAYLOAD_PREFIX}{line}\n")
+        for position, filepath in skipped_files:
+            file.write(f"@skipped\t{position}\t{filepath}\n")
+
+
+def read_partial(partial_path):
+    """
+    Read a partial result file.
+
+    Returns:
+        Dictionary with the shard, output name, options, inputs, records
+        and skipped files
+    """
+    partial = {
+        'shard': None, 'output': None, 'options': None, 'inputs': None,
+        'records': [], 'skipped': [],
+    }
+    lines = None
+
+    with open(partial_path, 'r', encoding='utf-8') as file:
+        for line in file:
+            line = line.rstrip('\n')
+            if line.startswith(PAYLOAD_PREFIX) and lines is not None:
+                lines.append(line[len(PAYLOAD_PREFIX):])
+                continue
+
+            fields = line.split('\t')
+            if fields[0] == '@shard':
+                partial['shard'] = (int(fields[1]), int(fields[2]))
+            elif fields[0] == '@output':
+                partial['output'] = fields[1]
+            elif fields[0] == '@options':
+                partial['options'] = fields[1]
+            elif fields[0] == '@inputs':
+                partial['inputs'] = (int(fields[1]), fields[2])
+            elif fields[0] == '@file':
+                lines = []
+                partial['records'].append((int(fields[1]), fields[2], lines))
+            elif fields[0] == '@skipped':
+                partial['skipped'].append((int(fields[1]), fields[2]))
+            else:
+                raise ValueError(f"Invalid partial result file: {partial_path}")
+
+    if any(partial[key] is None for key in ('shard', 'output', 'options', 'inputs')):
+        raise ValueError(f"Invalid partial result file: {partial_path}")
+
+    return partial
+
+
+def read_partials(partial_paths):
+    """
+    Read and validate the partial result files of every shard of a run.
+
+    Args:
+        partial_paths: Paths of the partial result files
+
+    Returns:
+        Tuple (output name, records in input order, skipped files in input order)
+    """
+    partials = [read_partial(partial_path) for partial_path in partial_paths]
+    if not partials:
+        raise ValueError("No partial result files to merge")
+
+    totals = {partial['shard'][1] for partial in partials}
+    outputs = {partial['output'] for partial in partials}
+    for values, description in ((totals, 'shard counts'), (outputs, 'result files'),
+                                ({partial['options'] for partial in partials}, 'options'),
+                                ({partial['inputs'] for partial in partials}, 'input lists')):
+        if len(values) != 1:
+            raise ValueError(
+                f"Partial result files come from different runs ({description} differ)"
+            )
+
+    total = totals.pop()
+    shards = sorted(partial['shard'][0] for partial in partials)
+    if shards != list(range(1, total + 1)):
+        missing = sorted(set(range(1, total + 1)) - set(shards))
+        duplicated = sorted({shard for shard in shards if shards.count(shard) > 1})
+        raise ValueError(
+            f"Expected shards 1..{total} exactly once (missing: {missing}, "
+            f"duplicated: {duplicated})"
+        )
+
+    records = sorted(
+        (record for partial in partials for record in partial['records']),
+        key=lambda record: record[0],
+    )
+    skipped = sorted(skipped for partial in partials for skipped in partial['skipped'])
+
+    return outputs.pop(), records, [filepath for _, filepath in skipped]
@@ -1,57 +1,623 @@
 """Shared utility functions for file processing."""
 
+import argparse
+import bisect
+import bz2
+import glob
+import gzip
+import io
+import lzma
+import queue
 import sys
 import os
+import threading
+import zlib
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import partial
 
+from src.sharding import (
+    get_partial_path,
+    new_partial_header,
+    parse_shard,
+    read_partials,
+    select_shard,
+    write_partial,
+)
 
-def read_data(filepath, converter=float):
+MAX_INVALID_SAMPLES = 5
+REJECTS_BUFFER_SIZE = 1024 * 1024
+READ_BUFFER_SIZE = 1024 * 1024
+PREFETCH_QUEUE_CHUNKS = 8
+PREFETCH_PUT_TIMEOUT = 0.1
+GLOB_CHARS = '*?['
+
+COMPRESSION_OPENERS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+MAGIC_NUMBERS = (
+    (b'\x1f\x8b', '.gz'),
+    (b'BZh', '.bz2'),
+    (b'\xfd7zXZ\x00', '.xz'),
+)
+# Raised while reading a truncated or corrupt compressed file (or on I/O errors)
+DECOMPRESSION_ERRORS = (EOFError, OSError, lzma.LZMAError, zlib.error)
+
+
+def detect_compression(filepath):
     """
-    Read numbers from a file (one number per line).
+    Detect the compression of a file by its extension or magic bytes.
 
     Args:
-        filepath: Path to the file to read
-        converter: Function to convert each line (default: float)
+        filepath: Path to the file to inspect
 
     Returns:
-        List of converted values
+        Compression extension ('.gz', '.bz2' or '.xz'), or None if uncompressed
+    """
+    extension = os.path.splitext(filepath)[1].lower()
+    if extension in COMPRESSION_OPENERS:
+        return extension
+
+    with open(filepath, 'rb') as file:
+        header = file.read(6)
+
+    for magic, compression in MAGIC_NUMBERS:
+        if header.startswith(magic):
+            return compression
+
+    return None
+
+
+def open_input_binary(filepath, binary_file=None):
+    """
+    Open an input file as bytes, decompressing .gz/.bz2/.xz on the fly.
+
+    Args:
+        filepath: Path to the file to open
+        binary_file: Optional raw stream already reading the (decompressed)
+            file, e.g. a ChunkStream filled by a prefetching reader thread
+
+    Returns:
+        Binary file object reading through a large buffer
     """
+    if binary_file is not None:
+        return io.BufferedReader(binary_file, buffer_size=READ_BUFFER_SIZE)
+
     if not os.path.exists(filepath):
         raise FileNotFoundError(f"File not found: {filepath}")
 
-    data = []
-    skipped_lines = []
-    with open(filepath, 'r', encoding='utf-8') as file:
-        for line_num, line in enumerate(file, 1):
-            line = line.strip()
-            if not line:
-                continue
+    compression = detect_compression(filepath)
+    if compression is None:
+        return open(filepath, 'rb', buffering=READ_BUFFER_SIZE)
+
+    compressed = COMPRESSION_OPENERS[compression](filepath, 'rb')
+    return io.BufferedReader(compressed, buffer_size=READ_BUFFER_SIZE)
+
+
+def open_input(filepath, binary_file=None):
+    """
+    Open an input file as UTF-8 text, decompressing .gz/.bz2/.xz on the fly.
+
+    Args:
+        filepath: Path to the file to open
+        binary_file: Optional raw stream already reading the file
+            (see open_input_binary)
+
+    Returns:
+        Text file object reading through a large buffer
+    """
+    return io.TextIOWrapper(open_input_binary(filepath, binary_file), encoding='utf-8')
+
+
+def iter_chunks(file, size=READ_BUFFER_SIZE):
+    """Yield successive blocks of at most size bytes read from a binary file."""
+    return iter(partial(file.read, size), b'')
+
+
+def strip_compression_extension(filename):
+    """Remove a trailing .gz/.bz2/.xz extension from a filename."""
+    base, extension = os.path.splitext(filename)
+    if extension.lower() in COMPRESSION_OPENERS:
+        return base
+    return filename
+
+
+class ChunkStream(io.RawIOBase):
+    """
+    Raw read-only stream fed with chunks by another thread.
+
+    The chunks go through a bounded queue, so a producer that gets ahead
+    of the consumer blocks (back-pressure) instead of buffering the whole
+    file. Closing the stream tells the producer to stop.
+    """
+
+    def __init__(self, max_chunks=PREFETCH_QUEUE_CHUNKS):
+        super().__init__()
+        self.chunks = queue.Queue(max_chunks)
+        self.cancelled = threading.Event()
+        self.pending = memoryview(b'')
+        self.finished = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.pending:
+            if self.finished:
+                return 0
+            chunk = self.chunks.get()
+            if chunk is None:
+                self.finished = True
+                return 0
+            if isinstance(chunk, BaseException):
+                self.finished = True
+                raise chunk
+            self.pending = memoryview(chunk)
+
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+    def put(self, chunk):
+        """
+        Queue a chunk (None marks the end, an exception is raised to the reader).
+
+        Returns:
+            False if the stream was closed by the consumer
+        """
+        while not self.cancelled.is_set():
             try:
-                data.append(converter(line))
-            except ValueError:
-                skipped_lines.append((line_num, line))
+                self.chunks.put(chunk, timeout=PREFETCH_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def close(self):
+        self.cancelled.set()
+        super().close()
+
+
+def read_ahead(filepath, stream):
+    """Read (and decompress) a file into a ChunkStream, on a reader thread."""
+    try:
+        with open_input_binary(filepath) as file:
+            for chunk in iter_chunks(file):
+                if not stream.put(chunk):
+                    return
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        # Forwarded to the consumer thread, which raises it when reading
+        stream.put(e)
+        return
+    stream.put(None)
+
+
+def iter_pipelined_tasks(task_fn, filepaths, prefetch):
+    """
+    Run task_fn over filepaths while reader threads prefetch the next files.
+
+    Up to prefetch files ahead of the one being computed are read (and
+    decompressed) on I/O threads. Each file is passed to task_fn as a
+    ChunkStream through the binary_file keyword argument, so computing
+    one file overlaps with reading the next ones. The reader of the file
+    being computed keeps its thread until the file is fully read, so
+    prefetch + 1 reader threads are used. Memory is capped at about
+    (prefetch + 1) * PREFETCH_QUEUE_CHUNKS * READ_BUFFER_SIZE bytes.
+
+    Args:
+        task_fn: Function taking a filepath and a binary_file keyword argument
+        filepaths: List of input filepaths
+        prefetch: Number of files read ahead
+
+    Yields:
+        (filepath, get_result) pairs in input order; get_result() must be
+        called before the next pair is requested, as its stream is then closed
+    """
+    remaining = iter(filepaths)
+    in_flight = deque()
+
+    with ThreadPoolExecutor(max_workers=prefetch + 1) as executor:
+        def start_next():
+            filepath = next(remaining, None)
+            if filepath is not None:
+                stream = ChunkStream()
+                executor.submit(read_ahead, filepath, stream)
+                in_flight.append((filepath, stream))
+
+        try:
+            for _ in range(prefetch):
+                start_next()
+
+            while in_flight:
+                filepath, stream = in_flight.popleft()
+                start_next()
+                yield filepath, partial(task_fn, filepath, binary_file=stream)
+                stream.close()
+        finally:
+            for _, stream in in_flight:
+                stream.close()
+
+
+def iter_file_tasks(task_fn, filepaths, jobs=1, prefetch=0):
+    """
+    Run task_fn over filepaths, in a thread pool when jobs > 1.
+
+    Decompression and file reads release the GIL, so several
+    (compressed) files can be read at the same time. With prefetch > 0
+    the files are instead read ahead on I/O threads and computed in
+    order (see iter_pipelined_tasks); prefetch cannot be combined with
+    jobs > 1.
+
+    Args:
+        task_fn: Function taking a single filepath (and a binary_file
+            keyword argument when prefetch > 0)
+        filepaths: List of input filepaths
+        jobs: Number of worker threads
+        prefetch: Number of files read ahead by the I/O pipeline
+
+    Yields:
+        (filepath, get_result) pairs in input order, where get_result()
+        returns the task result or raises its exception
+    """
+    if prefetch > 0:
+        if jobs > 1:
+            raise ValueError("prefetch cannot be combined with jobs > 1")
+        yield from iter_pipelined_tasks(task_fn, filepaths, prefetch)
+        return
+
+    if jobs <= 1:
+        for filepath in filepaths:
+            yield filepath, partial(task_fn, filepath)
+        return
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {}
+        for filepath in largest_first(filepaths):
+            futures[filepath] = executor.submit(task_fn, filepath)
+        for filepath in filepaths:
+            yield filepath, futures[filepath].result
+
+
+def collect_file_results(task_fn, filepaths, jobs=1, prefetch=0):
+    """
+    Run task_fn over filepaths (see iter_file_tasks) and collect the results.
+
+    Missing, invalid and unreadable (e.g. truncated compressed) files are
+    reported and skipped instead of aborting the run.
+
+    Returns:
+        Tuple (list of file_data dictionaries with 'filepath', 'filename'
+        and 'results' keys, list of skipped filepaths)
+    """
+    all_results = []
+    skipped_files = []
+
+    for filepath, get_result in iter_file_tasks(task_fn, filepaths, jobs, prefetch):
+        try:
+            result = get_result()
+        except (FileNotFoundError, ValueError) as e:
+            print(f"Warning: Skipping file - {e}")
+            skipped_files.append(filepath)
+        except DECOMPRESSION_ERRORS as e:
+            print(f"Warning: Skipping file - Cannot read {filepath}: {e}")
+            skipped_files.append(filepath)
+        else:
+            all_results.append({
+                'filepath': filepath,
+                'filename': os.path.basename(filepath),
+                'results': result,
+            })
+
+    return all_results, skipped_files
+
+
+def file_size(filepath):
+    """Return the size of a file in bytes, or -1 if it cannot be read."""
+    try:
+        return os.stat(filepath).st_size
+    except OSError:
+        return -1
+
+
+def largest_first(filepaths):
+    """
+    Order filepaths by decreasing size so big files are scheduled first.
+
+    Ties keep their input order, so the schedule is deterministic.
+    """
+    return sorted(dict.fromkeys(filepaths), key=file_size, reverse=True)
+
+
+def scan_directory(directory, recursive=False):
+    """
+    List the regular files in a directory using os.scandir.
+
+    Hidden entries (starting with '.') are ignored; every other file is
+    listed, whatever its name, so use a glob pattern to select inputs in
+    a directory that also holds other files. Symbolic links to
+    directories are not descended into, so link cycles cannot recurse
+    forever. Directories that cannot be read are reported and skipped.
+
+    Args:
+        directory: Directory to scan
+        recursive: Whether to descend into subdirectories
+
+    Returns:
+        Sorted list of file paths
+    """
+    filepaths = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_file():
+                    filepaths.append(entry.path)
+                elif recursive and entry.is_dir(follow_symlinks=False):
+                    filepaths.extend(scan_directory(entry.path, recursive))
+    except OSError as e:
+        print(f"Warning: Skipping directory - Cannot read {directory}: {e.strerror}")
+    return sorted(filepaths)
+
+
+def read_manifest(manifest_path):
+    """
+    Read input paths from a manifest file (one path per line).
+
+    Blank lines and lines starting with '#' are ignored.
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as file:
+        return [
+            line.strip() for line in file
+            if line.strip() and not line.strip().startswith('#')
+        ]
+
+
+def expand_inputs(inputs, recursive=False):
+    """
+    Expand directories and glob patterns into a list of file paths.
+
+    Directories are scanned (recursively if requested), glob patterns
+    are matched in sorted order and other paths are kept as given so
+    missing files are still reported as skipped. An existing path is
+    never treated as a pattern, even if its name holds glob characters,
+    and a pattern that matches no file is kept as given so it is
+    reported as skipped too. Duplicates are dropped.
+
+    Args:
+        inputs: List of paths, directories or glob patterns
+        recursive: Whether to descend into subdirectories ('**' in globs)
+
+    Returns:
+        List of file paths in a deterministic order
+    """
+    filepaths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            filepaths.extend(scan_directory(item, recursive))
+        elif not os.path.exists(item) and any(char in item for char in GLOB_CHARS):
+            matches = [path for path in sorted(glob.glob(item, recursive=recursive))
+                       if os.path.isfile(path)]
+            filepaths.extend(matches or [item])
+        else:
+            filepaths.append(item)
+    return list(dict.fromkeys(filepaths))
+
+
+def new_invalid_line_policy(max_samples=MAX_INVALID_SAMPLES, rejects_file=None, filepaths=()):
+    """
+    Create a policy describing how invalid lines are handled by read_data.
+
+    Only the first max_samples invalid lines (in input order, then line
+    order, even when files are processed in parallel) are kept in memory;
+    every other invalid line is just counted (and written to rejects_file
+    if set).
+
+    Args:
+        max_samples: Maximum number of invalid lines kept as samples
+        rejects_file: Optional open text file receiving every invalid line
+        filepaths: Input filepaths, in input order (other sources are
+            ordered after them, by name)
+
+    Returns:
+        Dictionary with the policy settings and its counters
+    """
+    return {
+        'max_samples': max_samples,
+        'rejects_file': rejects_file,
+        'order': {filepath: position for position, filepath in enumerate(filepaths)},
+        'counts': {},
+        'samples': [],
+        'lock': threading.Lock(),
+    }
+
+
+def invalid_line_key(policy, filepath, line_num=0):
+    """Sort key of an invalid line: input order of its file, then line number."""
+    order = policy['order']
+    return order.get(filepath, len(order)), filepath, line_num
+
+
+def record_invalid_line(policy, filepath, line_num, line):
+    """Count an invalid line, keeping it as a sample if it is among the first ones."""
+    with policy['lock']:
+        counts = policy['counts']
+        counts[filepath] = counts.get(filepath, 0) + 1
+
+        max_samples = policy['max_samples']
+        samples = policy['samples']
+        key = invalid_line_key(policy, filepath, line_num)
+        if max_samples and (len(samples) < max_samples
+                            or key < invalid_line_key(policy, *samples[-1][:2])):
+            bisect.insort(samples, (filepath, line_num, line),
+                          key=lambda sample: invalid_line_key(policy, *sample[:2]))
+            del samples[max_samples:]
+
+        if policy['rejects_file'] is not None:
+            policy['rejects_file'].write(f"{filepath}:{line_num}:{line}\n")
+
+
+def format_invalid_lines_summary(policy):
+    """
+    Build a single summary line for the invalid lines recorded in a policy.
+
+    The line gives the number of invalid lines of each file, in input order.
+
+    Returns:
+        Summary string, or None when no invalid lines were recorded
+    """
+    counts = policy['counts']
+    total = sum(counts.values())
+    if not total:
+        return None
+
+    per_file = ', '.join(
+        f"{filepath}: {counts[filepath]}"
+        for filepath in sorted(counts, key=partial(invalid_line_key, policy))
+    )
+    samples = ', '.join(
+        f"line {line_num} in {filepath}: '{line}'"
+        for filepath, line_num, line in policy['samples']
+    )
+    summary = (f"Warning: Skipped {total} invalid line(s) in {len(counts)} file(s) "
+               f"[{per_file}]")
+    if samples:
+        summary += f" (e.g. {samples})"
+    return summary
+
+
+def print_invalid_lines_summary(policy):
+    """Print the invalid lines summary, if any."""
+    summary = format_invalid_lines_summary(policy)
+    if summary:
+        print(summary)
+
+
+@contextmanager
+def open_invalid_line_policy(max_samples=MAX_INVALID_SAMPLES, rejects_path=None, filepaths=()):
+    """
+    Context manager yielding a policy, with an optional buffered rejects file.
 
-    if skipped_lines:
-        for line_num, line in skipped_lines:
-            print(f"Warning: Skipped invalid data at line {line_num} in {filepath}: '{line}'")
+    The summary line is printed when the context exits.
+
+    Args:
+        max_samples: Maximum number of invalid lines kept as samples
+        rejects_path: Optional path where every invalid line is written
+        filepaths: Input filepaths, in input order
+    """
+    if rejects_path is None:
+        policy = new_invalid_line_policy(max_samples, filepaths=filepaths)
+        yield policy
+        print_invalid_lines_summary(policy)
+        return
+
+    os.makedirs(os.path.dirname(os.path.abspath(rejects_path)), exist_ok=True)
+    with open(rejects_path, 'w', encoding='utf-8',
+              buffering=REJECTS_BUFFER_SIZE) as rejects_file:
+        policy = new_invalid_line_policy(max_samples, rejects_file, filepaths)
+        yield policy
+    print_invalid_lines_summary(policy)
+
+
+def iter_values(items, converter=float, policy=None, source='<data>'):
+    """
+    Convert lines (or already numeric items) into values, one at a time.
+
+    Blank lines are ignored. Items the converter rejects are handled by
+    the given policy. Without a policy only a few samples are kept and a
+    single summary line is printed for the source once it is exhausted.
+
+    Args:
+        items: Iterable of text lines and/or numbers
+        converter: Function to convert each item (default: float)
+        policy: Optional invalid line policy (see new_invalid_line_policy)
+        source: Name used for the source in warnings
+
+    Yields:
+        Converted values
+    """
+    item_policy = policy if policy is not None else new_invalid_line_policy()
+
+    for line_num, item in enumerate(items, 1):
+        if isinstance(item, str):
+            item = item.strip()
+            if not item:
+                continue
+        try:
+            value = converter(item)
+        except (TypeError, ValueError):
+            record_invalid_line(item_policy, source, line_num, item)
+            continue
+        yield value
+
+    if policy is None:
+        print_invalid_lines_summary(item_policy)
+
+
+def parse_values(items, converter=float, policy=None, source='<data>'):
+    """
+    Convert lines (or already numeric items) into a list of values.
+
+    See iter_values for how blank and invalid lines are handled.
+
+    Returns:
+        List of converted values
+    """
+    data = list(iter_values(items, converter, policy, source))
 
     if not data:
-        raise ValueError(f"File is empty or contains no valid data: {filepath}")
+        raise ValueError(f"File is empty or contains no valid data: {source}")
 
     return data
 
 
-def save_results(output_lines, output_path):
+def read_data(filepath, converter=float, policy=None):
+    """
+    Read numbers from a file (one number per line).
+
+    Compressed files (.gz, .bz2, .xz) are decompressed while reading.
+
+    Invalid lines are handled by the given policy. Without a policy only
+    a few samples are kept and a single summary line is printed for the file.
+
+    Args:
+        filepath: Path to the file to read
+        converter: Function to convert each line (default: float)
+        policy: Optional invalid line policy (see new_invalid_line_policy)
+
+    Returns:
+        List of converted values
+    """
+    with open_input(filepath) as file:
+        return parse_values(file, converter, policy, filepath)
+
+
+def save_results(output_lines, output_path, echo=False):
     """
     Save results to a file.
 
+    The lines are written in a single pass, so output_lines may be an iterator.
+
     Args:
-        output_lines: List of lines to write
+        output_lines: Iterable of lines to write
         output_path: Full path to the output file
+        echo: Whether to also print each line to the console
     """
     try:
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
         with open(output_path, 'w', encoding='utf-8') as file:
-            file.write('\n'.join(output_lines))
+            for index, line in enumerate(output_lines):
+                if index:
+                    file.write('\n')
+                file.write(line)
+                if echo:
+                    print(line)
         relative_path = os.path.relpath(output_path)
         print(f"\nResults saved to: {relative_path}")
     except PermissionError:
@@ -59,12 +625,6 @@ def save_results(output_lines, output_path):
         sys.exit(1)
 
 
-def print_results(output_lines):
-    """Print results to console."""
-    for line in output_lines:
-        print(line)
-
-
 def print_skipped_files(skipped_files):
     """Print summary of skipped files."""
     if skipped_files:
@@ -83,37 +643,219 @@ def get_output_path(output_path, filepaths):
         Modified output path
     """
     if len(filepaths) == 1:
-        input_name = os.path.splitext(os.path.basename(filepaths[0]))[0]
+        input_name = strip_compression_extension(os.path.basename(filepaths[0]))
+        input_name = os.path.splitext(input_name)[0]
         base, ext = os.path.splitext(output_path)
         return f"{base}_{input_name}{ext}"
     return output_path
 
 
-def run_main(usage, process_fn, format_fn, output_path):
+@dataclass(slots=True)
+class Script:
     """
-    Common main function logic for file processing scripts.
+    Description of a file processing script, run by run_main.
 
-    Args:
+    Attributes:
         usage: Usage string to display if no arguments provided
         process_fn: Function to process filepaths, returns (results, skipped_files)
-        format_fn: Function to format results into output lines
-        output_path: Path to save results
+            and takes jobs and prefetch keyword arguments. Each result is a dictionary
+            with at least 'filepath' and 'filename' keys
+        format_file_fn: Function formatting one file's results into output lines
+        combine_fn: Function (filenames, per-file output lines) -> output lines
+            (may be a generator)
+        output_path: Default path to save results
+        invalid_lines: Whether process_fn takes an invalid line policy
+        extra_arguments: Script specific (flags, add_argument kwargs) pairs;
+            each kwargs must name its 'dest', which is passed on to process_fn
+    """
+
+    usage: str
+    process_fn: Callable
+    format_file_fn: Callable
+    combine_fn: Callable
+    output_path: str
+    invalid_lines: bool = False
+    extra_arguments: tuple = ()
+
+
+def parse_args(usage, argv=None, invalid_lines=False, extra_arguments=()):
+    """
+    Parse command line arguments shared by the file processing scripts.
+
+    Input directories, glob patterns and manifest entries are expanded
+    into args.filepaths. Prints the usage and exits when no inputs are given.
+    When the first argument is 'merge', the remaining inputs are partial
+    result files of a sharded run and args.command is set to 'merge'.
+
+    Args:
+        usage: Usage string to display if no input files provided
+        argv: Argument list to parse (default: sys.argv[1:])
+        invalid_lines: Whether to accept the invalid line policy options
+        extra_arguments: Script specific (flags, add_argument kwargs) pairs
+
+    Returns:
+        Parsed arguments namespace
     """
-    if len(sys.argv) < 2:
+    argv = sys.argv[1:] if argv is None else argv
+    command = 'run'
+    if argv and argv[0] == 'merge':
+        command, argv = 'merge', argv[1:]
+
+    parser = argparse.ArgumentParser(usage=usage.replace('Usage: ', '', 1))
+    parser.add_argument('filepaths', nargs='*')
+    parser.add_argument('--recursive', '-r', action='store_true',
+                        help='descend into subdirectories of input directories')
+    parser.add_argument('--manifest', default=None,
+                        help='file listing one input path per line')
+    parser.add_argument('--output', default=None,
+                        help='path of the result file (the partial result with --shard)')
+    if command == 'run':
+        parser.add_argument('--jobs', type=int, default=1,
+                            help='number of files processed in parallel')
+        parser.add_argument('--prefetch', type=int, default=0,
+                            help='read up to N files ahead on I/O threads while computing '
+                                 '(not with --jobs)')
+        parser.add_argument('--shard', type=parse_shard, default=None,
+                            help='only process shard i of N (i/N) and write a partial result')
+    if command == 'run' and invalid_lines:
+        parser.add_argument('--max-invalid-samples', type=int, default=MAX_INVALID_SAMPLES,
+                            help='number of invalid lines shown in the summary')
+        parser.add_argument('--rejects', default=None,
+                            help='file where every invalid line is written')
+    if command == 'run':
+        for flags, options in extra_arguments:
+            parser.add_argument(*flags, **options)
+
+    args = parser.parse_args(argv)
+    if command == 'run' and args.prefetch > 0 and args.jobs > 1:
+        parser.error("--prefetch cannot be combined with --jobs greater than 1")
+    args.command = command
+    inputs = args.filepaths
+    if args.manifest:
+        try:
+            inputs = inputs + read_manifest(args.manifest)
+        except OSError as e:
+            print(f"Error: Cannot read manifest - {e}")
+            sys.exit(1)
+
+    if not inputs:
         print(usage)
         sys.exit(1)
 
-    filepaths = sys.argv[1:]
-    all_results, skipped_files = process_fn(filepaths)
+    args.filepaths = expand_inputs(inputs, args.recursive)
+    return args
+
+
+def get_script_options(args, script):
+    """Return the script specific options (its extra_arguments) as a dictionary."""
+    return {argument['dest']: getattr(args, argument['dest'])
+            for _, argument in script.extra_arguments}
+
+
+def process_inputs(args, script):
+    """Run the script's process_fn over args.filepaths with the command line options."""
+    options = {'jobs': args.jobs, 'prefetch': args.prefetch, **get_script_options(args, script)}
+
+    if script.invalid_lines:
+        with open_invalid_line_policy(args.max_invalid_samples, args.rejects,
+                                      args.filepaths) as policy:
+            return script.process_fn(args.filepaths, policy=policy, **options)
+    return script.process_fn(args.filepaths, **options)
+
+
+def run_shard(args, script):
+    """
+    Process the inputs of one shard and write its partial result file.
+
+    Args:
+        args: Parsed arguments, with args.shard set
+        script: Script being run
+    """
+    output_name = os.path.basename(get_output_path(script.output_path, args.filepaths))
+    header = new_partial_header(args.shard, output_name, get_script_options(args, script),
+                                args.filepaths)
+    shard_inputs = select_shard(args.filepaths, args.shard)
+    positions = {filepath: position for position, filepath in shard_inputs}
+
+    args.filepaths = [filepath for _, filepath in shard_inputs]
+    all_results, skipped_files = process_inputs(args, script)
+
+    records = (
+        (positions[file_data['filepath']], file_data['filename'],
+         script.format_file_fn(file_data))
+        for file_data in all_results
+    )
+    skipped = [(positions[filepath], filepath) for filepath in skipped_files]
+
+    partial_path = args.output or get_partial_path(script.output_path, args.shard)
+    write_partial(partial_path, header, records, skipped)
+
+    shard_index, shard_count = args.shard
+    print(f"Shard {shard_index}/{shard_count}: processed {len(all_results)} file(s)")
+    print(f"Partial results saved to: {os.path.relpath(partial_path)}")
+    print_skipped_files(skipped_files)
+
+
+def run_merge(args, script):
+    """
+    Merge the partial result files of a sharded run into the final results.
+
+    Args:
+        args: Parsed arguments, with the partial result files in args.filepaths
+        script: Script being run (its output directory is used by default)
+    """
+    try:
+        output_name, records, skipped_files = read_partials(args.filepaths)
+        filenames = [filename for _, filename, _ in records]
+        output_lines = script.combine_fn(filenames, [lines for _, _, lines in records])
+    except (OSError, ValueError) as e:
+        print(f"Error: Cannot merge partial results - {e}")
+        sys.exit(1)
+
+    if not records:
+        print("Error: No valid files to process")
+        sys.exit(1)
+
+    merged_path = args.output or os.path.join(os.path.dirname(script.output_path), output_name)
+    save_results(output_lines, merged_path, echo=True)
+    print_skipped_files(skipped_files)
+
+
+def run_main(script, argv=None):
+    """
+    Common main function logic for file processing scripts.
+
+    Results are formatted per file with script.format_file_fn and combined
+    with script.combine_fn, so a sharded run can store the per-file output
+    lines in a partial result file and 'merge' can combine them later.
+
+    Args:
+        script: Script to run
+        argv: Argument list to parse (default: sys.argv[1:])
+    """
+    args = parse_args(script.usage, argv, script.invalid_lines, script.extra_arguments)
+
+    if args.command == 'merge':
+        run_merge(args, script)
+        return
+
+    if args.shard:
+        run_shard(args, script)
+        return
+
+    filepaths = args.filepaths
+    all_results, skipped_files = process_inputs(args, script)
 
     if not all_results:
         print("Error: No valid files to process")
         sys.exit(1)
 
-    output_lines = format_fn(all_results)
+    filenames = [file_data['filename'] for file_data in all_results]
+    output_lines = script.combine_fn(
+        filenames, (script.format_file_fn(data) for data in all_results)
+    )
 
-    final_output_path = get_output_path(output_path, filepaths)
+    final_output_path = args.output or get_output_path(script.output_path, filepaths)
 
-    print_results(output_lines)
-    save_results(output_lines, final_output_path)
+    save_results(output_lines, final_output_path, echo=True)
     print_skipped_files(skipped_files)
@@ -1,6 +1,102 @@
 """Word counting functions implementation."""
 
+import sys
+from array import array
+from collections.abc import Mapping
+
 PUNCTUATION = '.,;:!?()[]{}"\'-'
+PUNCTUATION_TABLE = str.maketrans('', '', PUNCTUATION)
+PUNCTUATION_BYTES = PUNCTUATION.encode('ascii')
+# ASCII characters str.split() treats as whitespace but bytes.split() does not
+STR_ONLY_SEPARATORS = (b'\x1c', b'\x1d', b'\x1e', b'\x1f')
+# ASCII whitespace bytes, separators for both bytes.split() and str.split()
+ASCII_WHITESPACE = b' \t\n\r\x0b\x0c'
+
+
+class WordCounts(Mapping):
+    """
+    Compact word frequency store.
+
+    Each distinct word is interned and mapped to an integer ID, and the
+    counts live in an unsigned 64-bit array indexed by that ID. The array
+    stores counts unboxed (8 bytes each) instead of keeping one int object
+    per word; reading or incrementing a count still creates a temporary
+    int. The word to ID dict holds one key per distinct word, as a plain
+    dict of counts would, so the store saves little memory on its own.
+    Words keep their first-seen order. Behaves as a read-only mapping of
+    word to count.
+    """
+
+    __slots__ = ('ids', 'counts')
+
+    def __init__(self):
+        self.ids = {}
+        self.counts = array('Q')
+
+    def add(self, word, amount=1):
+        """Add amount occurrences of word."""
+        word_id = self.ids.get(word)
+        if word_id is None:
+            self.ids[sys.intern(word)] = len(self.counts)
+            self.counts.append(amount)
+        else:
+            self.counts[word_id] += amount
+
+    def __getitem__(self, word):
+        return self.counts[self.ids[word]]
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def items(self):
+        """Iterate (word, count) pairs in first-seen order."""
+        return zip(self.ids, self.counts)
+
+    def total(self):
+        """Return the total number of words counted."""
+        return sum(self.counts)
+
+    def iter_lines(self, separator='\t'):
+        """Yield one formatted 'word<separator>count' line per word."""
+        for word, word_count in self.items():
+            yield f"{word}{separator}{word_count}"
+
+
+class ByteWordCounts(WordCounts):
+    """
+    WordCounts keyed by UTF-8 encoded words.
+
+    Words are added as bytes and only decoded when they are read back,
+    so each distinct word is decoded once, at output time.
+    """
+
+    __slots__ = ()
+
+    def add(self, word, amount=1):
+        """Add amount occurrences of a UTF-8 encoded word."""
+        word_id = self.ids.get(word)
+        if word_id is None:
+            self.ids[word] = len(self.counts)
+            self.counts.append(amount)
+        else:
+            self.counts[word_id] += amount
+
+    def __getitem__(self, word):
+        return self.counts[self.ids[word.encode('utf-8')]]
+
+    def __contains__(self, word):
+        return isinstance(word, str) and word.encode('utf-8') in self.ids
+
+    def __iter__(self):
+        return (word.decode('utf-8') for word in self.ids)
+
+    def items(self):
+        """Iterate decoded (word, count) pairs in first-seen order."""
+        return ((word.decode('utf-8'), word_count)
+                for word, word_count in zip(self.ids, self.counts))
 
 
 def strip_punctuation(word):
@@ -13,11 +109,7 @@ def strip_punctuation(word):
     Returns:
         Word without leading/trailing punctuation
     """
-    result = ''
-    for char in word:
-        if char not in PUNCTUATION:
-            result += char
-    return result
+    return word.translate(PUNCTUATION_TABLE)
 
 
 def count_words(text):
@@ -53,6 +145,105 @@ def count_words_in_lines(lines):
     return total
 
 
+def count_word_lines(lines, counts=None):
+    """
+    Count words line by line into a compact WordCounts store.
+
+    Only one line is split at a time, so the full list of words is
+    never held in memory.
+
+    Args:
+        lines: Iterable of strings
+        counts: Optional WordCounts to add to
+
+    Returns:
+        WordCounts with the frequency of each word
+    """
+    if counts is None:
+        counts = WordCounts()
+
+    add = counts.add
+    for line in lines:
+        # Punctuation is never whitespace, so it can be removed before splitting
+        for word in line.translate(PUNCTUATION_TABLE).split():
+            add(word)
+
+    return counts
+
+
+def count_byte_block(block, counts):
+    """
+    Count the words of a block of whole UTF-8 lines into a ByteWordCounts.
+
+    ASCII blocks are split and stripped of punctuation as bytes. Other
+    blocks fall back to str.split() so Unicode whitespace is handled the
+    same way as in count_word_lines.
+    """
+    add = counts.add
+    if block.isascii() and not any(sep in block for sep in STR_ONLY_SEPARATORS):
+        for word in block.translate(None, PUNCTUATION_BYTES).split():
+            add(word)
+        return
+
+    for word in block.decode('utf-8').translate(PUNCTUATION_TABLE).split():
+        add(word.encode('utf-8'))
+
+
+def find_block_end(chunk):
+    """
+    Return the index just past the last line break of a chunk.
+
+    Chunks without a line break are cut after their last ASCII whitespace
+    byte instead (never inside a UTF-8 character), or not at all (0).
+    """
+    cut = chunk.rfind(b'\n')
+    if cut < 0:
+        cut = max(chunk.rfind(space) for space in ASCII_WHITESPACE)
+    return cut + 1
+
+
+def count_word_bytes(chunks, counts=None):
+    """
+    Count words in UTF-8 encoded text given as byte chunks.
+
+    Chunks may end in the middle of a line; the text after the last line
+    break (or whitespace) is carried over to the next chunk. Carried-over
+    parts are collected in a list and joined once, so very long lines or
+    words stay linear. The result matches count_word_lines on the decoded
+    text.
+
+    Args:
+        chunks: Iterable of bytes objects
+        counts: Optional ByteWordCounts to add to
+
+    Returns:
+        ByteWordCounts with the frequency of each word
+    """
+    if counts is None:
+        counts = ByteWordCounts()
+
+    pending = []
+    for chunk in chunks:
+        cut = find_block_end(chunk)
+        if not cut:
+            pending.append(chunk)
+            continue
+
+        block = chunk if cut == len(chunk) else chunk[:cut]
+        if pending:
+            pending.append(block)
+            block = b''.join(pending)
+            pending.clear()
+        count_byte_block(block, counts)
+        if cut < len(chunk):
+            pending.append(chunk[cut:])
+
+    if pending:
+        count_byte_block(b''.join(pending), counts)
+
+    return counts
+
+
 def get_word_frequencies(text):
     """
     Get frequency of each word in text.
@@ -66,12 +257,4 @@ def get_word_frequencies(text):
     if not text or not text.strip():
         return {}
 
-    words = text.split()
-    frequencies = {}
-
-    for word in words:
-        clean_word = strip_punctuation(word)
-        if clean_word:
-            frequencies[clean_word] = frequencies.get(clean_word, 0) + 1
-
-    return frequencies
+    return dict(count_word_lines([text]).items())
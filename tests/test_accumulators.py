@@ -0,0 +1,127 @@
+"""Tests for the streaming statistics accumulators."""
+
+# pylint: disable=missing-function-docstring
+
+import unittest
+
+from src.accumulators import (
+    HistogramAccumulator,
+    MinMaxAccumulator,
+    MomentAccumulator,
+    SumAccumulator,
+    ValueStore,
+)
+from src.stats import mean
+
+
+def feed(accumulator, data):
+    for value in data:
+        accumulator.add(value)
+    return accumulator
+
+
+def central_moment(data, order):
+    avg = mean(data)
+    return sum((value - avg) ** order for value in data) / len(data)
+
+
+class TestSumAccumulator(unittest.TestCase):
+    """Tests for the SumAccumulator class."""
+
+    def test_count_and_mean(self):
+        accumulator = feed(SumAccumulator(), [1.5, 2.5, 3.0])
+        self.assertEqual(accumulator.count, 3)
+        self.assertEqual(accumulator.mean(), mean([1.5, 2.5, 3.0]))
+
+
+class TestMinMaxAccumulator(unittest.TestCase):
+    """Tests for the MinMaxAccumulator class."""
+
+    def test_min_max(self):
+        accumulator = feed(MinMaxAccumulator(), [3, -1, 7, 2])
+        self.assertEqual((accumulator.minimum, accumulator.maximum), (-1, 7))
+        self.assertEqual(accumulator.range(), 8)
+
+    def test_single_value(self):
+        accumulator = feed(MinMaxAccumulator(), [5])
+        self.assertEqual((accumulator.minimum, accumulator.maximum), (5, 5))
+
+    def test_nan_skipped_in_any_position(self):
+        nan = float('nan')
+        for data in ([nan, 1.0, 2.0], [1.0, nan, 2.0], [1.0, 2.0, nan]):
+            with self.subTest(data=data):
+                accumulator = feed(MinMaxAccumulator(), data)
+                self.assertEqual((accumulator.minimum, accumulator.maximum), (1.0, 2.0))
+                self.assertEqual(accumulator.range(), 1.0)
+
+    def test_only_nan(self):
+        accumulator = feed(MinMaxAccumulator(), [float('nan')])
+        self.assertIsNone(accumulator.minimum)
+
+
+class TestMomentAccumulator(unittest.TestCase):
+    """Tests for the MomentAccumulator class."""
+
+    DATA = [2.0, 8.0, 3.0, 3.0, 10.0, 1.0, 4.0, 4.5]
+
+    def test_mean_and_variance(self):
+        accumulator = feed(MomentAccumulator(), self.DATA)
+        self.assertAlmostEqual(accumulator.mean, mean(self.DATA))
+        self.assertAlmostEqual(accumulator.m2 / accumulator.count, central_moment(self.DATA, 2))
+
+    def test_skewness(self):
+        expected = central_moment(self.DATA, 3) / central_moment(self.DATA, 2) ** 1.5
+        self.assertAlmostEqual(feed(MomentAccumulator(), self.DATA).skewness(), expected)
+
+    def test_kurtosis(self):
+        expected = central_moment(self.DATA, 4) / central_moment(self.DATA, 2) ** 2 - 3
+        self.assertAlmostEqual(feed(MomentAccumulator(), self.DATA).kurtosis(), expected)
+
+    def test_symmetric_data(self):
+        self.assertAlmostEqual(feed(MomentAccumulator(), [1, 2, 3]).skewness(), 0)
+
+    def test_constant_data(self):
+        accumulator = feed(MomentAccumulator(), [5, 5, 5])
+        self.assertIsNone(accumulator.skewness())
+        self.assertIsNone(accumulator.kurtosis())
+
+
+class TestHistogramAccumulator(unittest.TestCase):
+    """Tests for the HistogramAccumulator class."""
+
+    def test_bins(self):
+        accumulator = feed(HistogramAccumulator(4, 0, 8), [0, 1, 2, 5, 7.9, 8])
+        self.assertEqual(accumulator.counts, [2, 1, 1, 2])
+
+    def test_out_of_range_ignored(self):
+        accumulator = feed(HistogramAccumulator(2, 0, 10), [-1, 11, 5])
+        self.assertEqual(accumulator.counts, [0, 1])
+
+    def test_non_finite_ignored(self):
+        accumulator = feed(HistogramAccumulator(2, 0, 10),
+                           [float('nan'), float('inf'), float('-inf'), 1])
+        self.assertEqual(accumulator.counts, [1, 0])
+
+    def test_invalid_bins(self):
+        for bins in (0, -1):
+            with self.assertRaises(ValueError):
+                HistogramAccumulator(bins, 0, 1)
+
+    def test_zero_width(self):
+        accumulator = feed(HistogramAccumulator(3, 5, 5), [5, 5])
+        self.assertEqual(accumulator.counts, [2, 0, 0])
+
+
+class TestValueStore(unittest.TestCase):
+    """Tests for the ValueStore class."""
+
+    def test_values(self):
+        self.assertEqual(list(feed(ValueStore(), [1.0, 2.0]).values), [1.0, 2.0])
+
+    def test_order_statistics(self):
+        store = feed(ValueStore(), [3.0, 1.0, 3.0, 2.0])
+        self.assertEqual((store.median(), store.mode(), store.variance()), (2.5, 3.0, 0.6875))
+
+
+if __name__ == '__main__':
+    unittest.main()
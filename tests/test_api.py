@@ -0,0 +1,181 @@
+"""Tests for the in-process API."""
+
+# pylint: disable=missing-function-docstring
+
+import io
+import math
+import unittest
+from array import array
+from contextlib import redirect_stdout
+
+from src.api import (
+    Conversion,
+    StatisticsOptions,
+    compute_statistics_from,
+    convert_numbers_from,
+    count_words_from,
+    load_values,
+)
+
+
+class TestLoadValues(unittest.TestCase):
+    """Tests for the load_values function."""
+
+    def test_iterable_of_numbers(self):
+        self.assertEqual(load_values([1, 2, 3]), [1.0, 2.0, 3.0])
+
+    def test_iterable_of_lines(self):
+        self.assertEqual(load_values(['1\n', '\n', '2\n']), [1.0, 2.0])
+
+    def test_str(self):
+        self.assertEqual(load_values('1\n2\n'), [1.0, 2.0])
+
+    def test_bytes(self):
+        self.assertEqual(load_values(b'1\n2\n'), [1.0, 2.0])
+
+    def test_bytearray(self):
+        self.assertEqual(load_values(bytearray(b'1\n2\n')), [1.0, 2.0])
+
+    def test_byte_memoryview_is_numeric(self):
+        values = array('B', [1, 2, 3])
+        self.assertEqual(load_values(memoryview(values)), load_values(values))
+        self.assertEqual(load_values(memoryview(b'12')), [49.0, 50.0])
+
+    def test_array(self):
+        self.assertEqual(load_values(array('i', [1, 2])), [1.0, 2.0])
+
+    def test_numeric_memoryview(self):
+        self.assertEqual(load_values(memoryview(array('d', [1.5, 2.5]))), [1.5, 2.5])
+
+    def test_invalid_items_skipped(self):
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(load_values(['1', 'abc', None, '2']), [1.0, 2.0])
+
+
+class TestComputeStatisticsFrom(unittest.TestCase):
+    """Tests for the compute_statistics_from function."""
+
+    def test_values(self):
+        result = compute_statistics_from([1, 2, 2, 3])
+        self.assertEqual(result.count, 4)
+        self.assertEqual(result.mean, 2)
+        self.assertEqual(result.median, 2)
+        self.assertEqual(result.mode, 2)
+        self.assertAlmostEqual(result.var, 0.5)
+
+    def test_slots(self):
+        result = compute_statistics_from(b'1\n2\n')
+        self.assertFalse(hasattr(result, '__dict__'))
+
+    def test_no_valid_data(self):
+        with redirect_stdout(io.StringIO()):
+            with self.assertRaises(ValueError):
+                compute_statistics_from(['abc'])
+
+    def test_selected_metrics_only(self):
+        options = StatisticsOptions(('Min', 'Max', 'Range'))
+        result = compute_statistics_from([1, 5, 3], options=options)
+        self.assertEqual((result.min, result.max, result.range), (1, 5, 4))
+        self.assertIsNone(result.mean)
+        self.assertIsNone(result.median)
+
+    def test_histogram_from_data_range(self):
+        result = compute_statistics_from([0, 1, 2, 3, 4], options=StatisticsOptions(('Hist',), 2))
+        self.assertEqual(result.hist, [2, 3])
+
+    def test_histogram_with_range(self):
+        options = StatisticsOptions(('Hist',), bins=2, hist_range=(0, 2))
+        result = compute_statistics_from([0, 1, 2, 3, 4], options=options)
+        self.assertEqual(result.hist, [1, 2])
+
+    def test_histogram_skips_non_finite(self):
+        data = ['nan', '0', 'inf', '4', '-inf']
+        options = StatisticsOptions(('Hist',), bins=2)
+        self.assertEqual(compute_statistics_from(data, options=options).hist, [1, 1])
+        options = StatisticsOptions(('Hist',), bins=2, hist_range=(0, 2))
+        self.assertEqual(compute_statistics_from(['nan', '1'], options=options).hist, [0, 1])
+
+    def test_min_max_independent_of_nan_position(self):
+        options = StatisticsOptions(('Min', 'Max', 'Range'))
+        for data in (['nan', '1', '2'], ['1', 'nan', '2']):
+            with self.subTest(data=data):
+                result = compute_statistics_from(data, options=options)
+                self.assertEqual((result.min, result.max, result.range), (1.0, 2.0, 1.0))
+        result = compute_statistics_from(['nan'], options=StatisticsOptions(('Range', 'Hist')))
+        self.assertTrue(math.isnan(result.range))
+        self.assertEqual(sum(result.hist), 0)
+
+    def test_invalid_bins(self):
+        with self.assertRaises(ValueError):
+            compute_statistics_from([1], options=StatisticsOptions(('Hist',), bins=0))
+
+    def test_skew_and_kurt(self):
+        result = compute_statistics_from([1, 2, 3], options=StatisticsOptions(('Skew', 'Kurt')))
+        self.assertAlmostEqual(result.skew, 0)
+        self.assertAlmostEqual(result.kurt, -1.5)
+
+    def test_unknown_metric(self):
+        with self.assertRaises(ValueError):
+            compute_statistics_from([1], options=StatisticsOptions(('Foo',)))
+
+
+class TestConvertNumbersFrom(unittest.TestCase):
+    """Tests for the convert_numbers_from function."""
+
+    def test_values(self):
+        result = convert_numbers_from(array('q', [10, -5]))
+        self.assertEqual(
+            result.conversions,
+            [Conversion(10, '1010', 'A'), Conversion(-5, '-101', '-5')],
+        )
+
+    def test_decimal_lines(self):
+        result = convert_numbers_from(['3.7'])
+        self.assertEqual(result.conversions, [Conversion(3, '11', '3')])
+
+    def test_large_integer_lines_are_exact(self):
+        result = convert_numbers_from(['9223372036854775807', '18446744073709551615'], width=64)
+        self.assertEqual(result.decimals, [2 ** 63 - 1, 2 ** 64 - 1])
+        self.assertEqual(result.hexadecimals, ['7FFFFFFFFFFFFFFF', 'FFFFFFFFFFFFFFFF'])
+        self.assertEqual(result.binaries, ['0' + '1' * 63, '1' * 64])
+
+    def test_infinite_lines_skipped(self):
+        with redirect_stdout(io.StringIO()):
+            result = convert_numbers_from(['1e3', 'inf', '-2.9'])
+        self.assertEqual(result.decimals, [1000, -2])
+
+    def test_width(self):
+        result = convert_numbers_from(['10', '-5'], width=8)
+        self.assertEqual(result.width, 8)
+        self.assertEqual(result.binaries, ['00001010', '11111011'])
+        self.assertEqual(result.hexadecimals, ['0A', 'FB'])
+        self.assertEqual(result.conversions[1], Conversion(-5, '11111011', 'FB'))
+
+
+class TestCountWordsFrom(unittest.TestCase):
+    """Tests for the count_words_from function."""
+
+    def test_str(self):
+        result = count_words_from("hello, hello world")
+        self.assertEqual(result.frequencies, {"hello": 2, "world": 1})
+        self.assertEqual(result.total, 3)
+
+    def test_bytes(self):
+        self.assertEqual(count_words_from(b"a b a").frequencies, {"a": 2, "b": 1})
+
+    def test_lines(self):
+        self.assertEqual(count_words_from(["a b", "a"]).frequencies, {"a": 2, "b": 1})
+
+    def test_memoryview(self):
+        self.assertEqual(count_words_from(memoryview(b"a b a")).frequencies, {"a": 2, "b": 1})
+
+    def test_binary_file_object(self):
+        self.assertEqual(count_words_from(io.BytesIO(b"a\nb a\n")).frequencies,
+                         {"a": 2, "b": 1})
+
+    def test_file_object(self):
+        self.assertEqual(count_words_from(io.StringIO("a\nb\n")).total, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
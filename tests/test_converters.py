@@ -4,7 +4,13 @@
 
 import unittest
 
-from src.converters import decimal_to_binary, decimal_to_hexadecimal
+from src.converters import (
+    OVERFLOW,
+    decimal_to_binary,
+    decimal_to_hexadecimal,
+    to_fixed_width,
+    twos_complement,
+)
 
 
 class TestDecimalToBinary(unittest.TestCase):
@@ -57,5 +63,79 @@ class TestDecimalToHexadecimal(unittest.TestCase):
         self.assertEqual(decimal_to_hexadecimal(-255), '-FF')
 
 
+class TestTwosComplement(unittest.TestCase):
+    """Tests for the twos_complement function."""
+
+    def test_signed_values(self):
+        patterns, overflows = twos_complement([0, 1, -1, -128, 127], 8)
+        self.assertEqual(list(patterns), [0, 1, 255, 128, 127])
+        self.assertEqual(overflows, [])
+
+    def test_unsigned_values(self):
+        patterns, overflows = twos_complement([255, -1], 8)
+        self.assertEqual(list(patterns), [255, 255])
+        self.assertEqual(overflows, [])
+
+    def test_out_of_range(self):
+        patterns, overflows = twos_complement([256, 5, -129], 8)
+        self.assertEqual(list(patterns), [0, 5, 0])
+        self.assertEqual(overflows, [0, 2])
+
+    def test_mixed_signed_and_unsigned(self):
+        for width in (8, 16, 32, 64):
+            mask = (1 << width) - 1
+            numbers = [-(1 << (width - 1)), -1, 0, 1 << (width - 1), mask, 7]
+            with self.subTest(width=width):
+                patterns, overflows = twos_complement(numbers, width)
+                self.assertEqual(list(patterns), [number & mask for number in numbers])
+                self.assertEqual(overflows, [])
+
+    def test_unsigned_64_bits(self):
+        patterns, overflows = twos_complement([2 ** 64 - 1, 2 ** 63, 0], 64)
+        self.assertEqual(list(patterns), [2 ** 64 - 1, 2 ** 63, 0])
+        self.assertEqual(overflows, [])
+
+    def test_out_of_range_with_unsigned(self):
+        patterns, overflows = twos_complement([200, -1, 2 ** 16, -2 ** 40], 16)
+        self.assertEqual(list(patterns), [200, 65535, 0, 0])
+        self.assertEqual(overflows, [2, 3])
+
+
+class TestToFixedWidth(unittest.TestCase):
+    """Tests for the to_fixed_width function."""
+
+    def test_8_bits(self):
+        self.assertEqual(
+            to_fixed_width([5, -5, 0], 8),
+            (['00000101', '11111011', '00000000'], ['05', 'FB', '00']),
+        )
+
+    def test_16_bits(self):
+        self.assertEqual(
+            to_fixed_width([-2, 4096], 16),
+            (['1111111111111110', '0001000000000000'], ['FFFE', '1000']),
+        )
+
+    def test_matches_format(self):
+        numbers = [-2 ** 63, -123456789, -1, 0, 1, 171, 2 ** 63 - 1, 2 ** 64 - 1]
+        for width in (32, 64):
+            mask = (1 << width) - 1
+            in_range = [number for number in numbers if -(1 << (width - 1)) <= number <= mask]
+            with self.subTest(width=width):
+                self.assertEqual(to_fixed_width(in_range, width), (
+                    [format(number & mask, f'0{width}b') for number in in_range],
+                    [format(number & mask, f'0{width // 4}X') for number in in_range],
+                ))
+
+    def test_overflow(self):
+        self.assertEqual(
+            to_fixed_width([300, 1], 8),
+            ([OVERFLOW, '00000001'], [OVERFLOW, '01']),
+        )
+
+    def test_empty(self):
+        self.assertEqual(to_fixed_width([], 32), ([], []))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,151 @@
+"""Tests for sharded runs and merging of partial results."""
+
+# pylint: disable=missing-function-docstring
+
+import argparse
+import os
+import tempfile
+import unittest
+
+from src.compute_statistics import combine_results
+from src.sharding import (
+    describe_inputs,
+    format_run_options,
+    new_partial_header,
+    parse_shard,
+    read_partials,
+    select_shard,
+    write_partial,
+)
+
+
+class TestParseShard(unittest.TestCase):
+    """Tests for the parse_shard function."""
+
+    def test_valid(self):
+        self.assertEqual(parse_shard('2/4'), (2, 4))
+
+    def test_out_of_range(self):
+        with self.assertRaises(argparse.ArgumentTypeError):
+            parse_shard('5/4')
+
+    def test_malformed(self):
+        with self.assertRaises(argparse.ArgumentTypeError):
+            parse_shard('2')
+
+
+class TestSelectShard(unittest.TestCase):
+    """Tests for the select_shard function."""
+
+    def test_round_robin(self):
+        self.assertEqual(select_shard(['a', 'b', 'c', 'd', 'e'], (2, 2)), [(1, 'b'), (3, 'd')])
+
+    def test_shards_cover_inputs_once(self):
+        filepaths = [f'file{i}' for i in range(10)]
+        selected = [item for shard in range(1, 4) for item in select_shard(filepaths, (shard, 3))]
+        self.assertEqual(sorted(selected), list(enumerate(filepaths)))
+
+
+class TestPartials(unittest.TestCase):
+    """Tests for writing and merging partial result files."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write(self, shard, records, skipped=(), output='Results.txt', **run):
+        path = os.path.join(self.tmpdir.name, f'part{shard[0]}')
+        write_partial(path, new_partial_header(shard, output, **run), records, list(skipped))
+        return path
+
+    def test_merge_in_input_order(self):
+        paths = [
+            self.write((1, 2), [(0, 'a.txt', ['a', '', '>x']), (2, 'c.txt', ['c'])]),
+            self.write((2, 2), [(1, 'b.txt', iter(['b']))], skipped=[(3, 'missing.txt')]),
+        ]
+        output_name, records, skipped = read_partials(paths)
+        self.assertEqual(output_name, 'Results.txt')
+        self.assertEqual(records, [
+            (0, 'a.txt', ['a', '', '>x']),
+            (1, 'b.txt', ['b']),
+            (2, 'c.txt', ['c']),
+        ])
+        self.assertEqual(skipped, ['missing.txt'])
+
+    def test_missing_shard(self):
+        with self.assertRaises(ValueError):
+            read_partials([self.write((1, 2), [])])
+
+    def test_different_runs(self):
+        paths = [self.write((1, 2), []), self.write((2, 2), [], output='Other.txt')]
+        with self.assertRaises(ValueError):
+            read_partials(paths)
+
+    def test_different_options(self):
+        paths = [
+            self.write((1, 2), [], options={'metrics': ('Min',)}),
+            self.write((2, 2), [], options={'metrics': ('Count', 'Mean')}),
+        ]
+        with self.assertRaisesRegex(ValueError, 'options differ'):
+            read_partials(paths)
+
+    def test_different_inputs(self):
+        paths = [
+            self.write((1, 2), [], filepaths=['a.txt', 'b.txt']),
+            self.write((2, 2), [], filepaths=['a.txt', 'c.txt']),
+        ]
+        with self.assertRaisesRegex(ValueError, 'input lists differ'):
+            read_partials(paths)
+
+    def test_missing_run_description(self):
+        path = os.path.join(self.tmpdir.name, 'old')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write('@shard\t1\t1\n@output\tResults.txt\n')
+        with self.assertRaises(ValueError):
+            read_partials([path])
+
+    def test_invalid_file(self):
+        path = os.path.join(self.tmpdir.name, 'invalid')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write('not a partial\n')
+        with self.assertRaises(ValueError):
+            read_partials([path])
+
+
+
+class TestRunOptions(unittest.TestCase):
+    """Tests for the descriptions of a run recorded in partial result files."""
+
+    def test_sequences_formatted_alike(self):
+        self.assertEqual(
+            format_run_options({'metrics': ['Min', 'Max'], 'bins': 10}),
+            format_run_options({'bins': 10, 'metrics': ('Min', 'Max')}),
+        )
+        self.assertEqual(format_run_options({'width': None}), 'width=None')
+
+    def test_describe_inputs(self):
+        count, digest = describe_inputs(['a.txt', 'b.txt'])
+        self.assertEqual(count, 2)
+        self.assertNotEqual(digest, describe_inputs(['b.txt', 'a.txt'])[1])
+        self.assertNotEqual(digest, describe_inputs(['a.txtb.txt'])[1])
+
+
+class TestCombineStatistics(unittest.TestCase):
+    """Tests for merging statistics columns."""
+
+    def test_same_metrics(self):
+        self.assertEqual(
+            combine_results(['a', 'b'], [['Min\t1', 'Time\t0.1'], ['Min\t2', 'Time\t0.2']]),
+            ['\ta\tb', 'Min\t1\t2', 'Time\t0.1\t0.2'],
+        )
+
+    def test_mismatched_metrics(self):
+        columns = [['Min\t1', 'Time\t0.1'], ['Count\t3', 'Mean\t2', 'Time\t0.2']]
+        with self.assertRaisesRegex(ValueError, 'Metrics of b'):
+            combine_results(['a', 'b'], columns)
+        with self.assertRaises(ValueError):
+            combine_results(['b', 'a'], columns[::-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,441 @@
+"""Tests for shared utility functions."""
+
+# pylint: disable=missing-function-docstring
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+from src import compute_statistics, count_words
+from src.count_words import process_files as count_words_files
+from src.utils import (
+    ChunkStream,
+    Script,
+    collect_file_results,
+    detect_compression,
+    expand_inputs,
+    format_invalid_lines_summary,
+    get_output_path,
+    iter_file_tasks,
+    largest_first,
+    new_invalid_line_policy,
+    open_input,
+    parse_args,
+    read_data,
+    run_main,
+    scan_directory,
+)
+
+
+class TestReadDataInvalidLines(unittest.TestCase):
+    """Tests for the invalid line handling of read_data."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write_file(self, name, lines):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write('\n'.join(lines))
+        return path
+
+    def test_valid_data(self):
+        path = self.write_file('valid.txt', ['1', '2', '', '3'])
+        self.assertEqual(read_data(path), [1.0, 2.0, 3.0])
+
+    def test_counts_every_invalid_line(self):
+        path = self.write_file('dirty.txt', ['1', 'a', 'b', '2', 'c'])
+        policy = new_invalid_line_policy(max_samples=2)
+        self.assertEqual(read_data(path, policy=policy), [1.0, 2.0])
+        self.assertEqual(policy['counts'], {path: 3})
+
+    def test_samples_are_capped(self):
+        path = self.write_file('dirty.txt', ['x'] * 100 + ['1'])
+        policy = new_invalid_line_policy(max_samples=3)
+        read_data(path, policy=policy)
+        self.assertEqual(policy['samples'], [(path, 1, 'x'), (path, 2, 'x'), (path, 3, 'x')])
+
+    def test_rejects_file(self):
+        path = self.write_file('dirty.txt', ['1', 'bad', '2'])
+        rejects = io.StringIO()
+        policy = new_invalid_line_policy(max_samples=0, rejects_file=rejects)
+        read_data(path, policy=policy)
+        self.assertEqual(rejects.getvalue(), f"{path}:2:bad\n")
+        self.assertEqual(policy['samples'], [])
+
+    def test_single_summary_line_without_policy(self):
+        path = self.write_file('dirty.txt', ['a'] * 50 + ['1'])
+        output = io.StringIO()
+        with redirect_stdout(output):
+            read_data(path)
+        self.assertEqual(len(output.getvalue().splitlines()), 1)
+        self.assertIn('Skipped 50 invalid line(s)', output.getvalue())
+
+    def test_summary_counts_per_file(self):
+        paths = [self.write_file(name, lines) for name, lines in
+                 [('a.txt', ['x', '1', 'y']), ('b.txt', ['1']), ('c.txt', ['z', '2'])]]
+        policy = new_invalid_line_policy(max_samples=1, filepaths=paths)
+        for path in paths:
+            read_data(path, policy=policy)
+        summary = format_invalid_lines_summary(policy)
+        self.assertIn(f"Skipped 3 invalid line(s) in 2 file(s) [{paths[0]}: 2, {paths[2]}: 1]",
+                      summary)
+        self.assertIn(f"line 1 in {paths[0]}: 'x'", summary)
+
+    def test_samples_in_input_order(self):
+        paths = [self.write_file(name, ['x', 'y', '1']) for name in ('a.txt', 'b.txt')]
+        policy = new_invalid_line_policy(max_samples=3, filepaths=paths)
+        # Files finishing in any order, as with --jobs
+        read_data(paths[1], policy=policy)
+        read_data(paths[0], policy=policy)
+        self.assertEqual(policy['samples'],
+                         [(paths[0], 1, 'x'), (paths[0], 2, 'y'), (paths[1], 1, 'x')])
+        self.assertEqual(list(policy['counts']), [paths[1], paths[0]])
+        self.assertLess(format_invalid_lines_summary(policy).index(paths[0]),
+                        format_invalid_lines_summary(policy).index(paths[1]))
+
+    def test_summary_without_invalid_lines(self):
+        self.assertIsNone(format_invalid_lines_summary(new_invalid_line_policy()))
+
+    def test_no_valid_data(self):
+        path = self.write_file('empty.txt', ['a', 'b'])
+        with redirect_stdout(io.StringIO()):
+            with self.assertRaises(ValueError):
+                read_data(path)
+
+
+class TestCompressedInput(unittest.TestCase):
+    """Tests for reading compressed input files."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write_compressed(self, name, opener):
+        path = os.path.join(self.tmpdir.name, name)
+        with opener(path, 'wt', encoding='utf-8') as file:
+            file.write('1\n2\n3\n')
+        return path
+
+    def test_gzip(self):
+        path = self.write_compressed('data.txt.gz', gzip.open)
+        self.assertEqual(read_data(path), [1.0, 2.0, 3.0])
+
+    def test_bz2(self):
+        path = self.write_compressed('data.txt.bz2', bz2.open)
+        self.assertEqual(read_data(path), [1.0, 2.0, 3.0])
+
+    def test_xz(self):
+        path = self.write_compressed('data.txt.xz', lzma.open)
+        self.assertEqual(read_data(path), [1.0, 2.0, 3.0])
+
+    def test_detect_by_magic_bytes(self):
+        path = self.write_compressed('data', gzip.open)
+        self.assertEqual(detect_compression(path), '.gz')
+        self.assertEqual(read_data(path), [1.0, 2.0, 3.0])
+
+    def test_detect_plain_text(self):
+        path = os.path.join(self.tmpdir.name, 'data.txt')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write('1\n')
+        self.assertIsNone(detect_compression(path))
+
+    def test_truncated_file_skipped(self):
+        path = os.path.join(self.tmpdir.name, 'truncated.txt.gz')
+        data = gzip.compress(b'word\n' * 1000)
+        with open(path, 'wb') as file:
+            file.write(data[:len(data) // 2])
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(count_words_files([path]), ([], [path]))
+        self.assertIn(f'Cannot read {path}', output.getvalue())
+
+    def test_output_path_strips_compression(self):
+        self.assertEqual(
+            get_output_path('results/Results.txt', ['data/TC1.txt.gz']),
+            'results/Results_TC1.txt',
+        )
+
+
+class TestIterFileTasks(unittest.TestCase):
+    """Tests for the iter_file_tasks function."""
+
+    def test_serial_order(self):
+        results = [get() for _, get in iter_file_tasks(str.upper, ['a', 'b', 'c'])]
+        self.assertEqual(results, ['A', 'B', 'C'])
+
+    def test_parallel_order(self):
+        results = [get() for _, get in iter_file_tasks(str.upper, ['a', 'b', 'c'], jobs=3)]
+        self.assertEqual(results, ['A', 'B', 'C'])
+
+    def test_exception_raised_on_get(self):
+        tasks = list(iter_file_tasks(int, ['1', 'x'], jobs=2))
+        self.assertEqual(tasks[0][1](), 1)
+        with self.assertRaises(ValueError):
+            tasks[1][1]()
+
+    def test_collect_file_results(self):
+        paths = ['1', 'x', os.path.join('d', '2')]
+        with redirect_stdout(io.StringIO()):
+            all_results, skipped_files = collect_file_results(
+                lambda path: int(os.path.basename(path)), paths, jobs=2)
+        self.assertEqual(
+            all_results,
+            [{'filepath': '1', 'filename': '1', 'results': 1},
+             {'filepath': os.path.join('d', '2'), 'filename': '2', 'results': 2}],
+        )
+        self.assertEqual(skipped_files, ['x'])
+
+
+class TestPipeline(unittest.TestCase):
+    """Tests for the prefetching I/O pipeline."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write_file(self, name, text):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+        return path
+
+    @staticmethod
+    def read_task(filepath, binary_file=None):
+        with open_input(filepath, binary_file) as file:
+            return file.read()
+
+    def test_chunk_stream(self):
+        stream = ChunkStream()
+        stream.put(b'hello ')
+        stream.put(b'world')
+        stream.put(None)
+        self.assertEqual(stream.read(), b'hello world')
+
+    def test_chunk_stream_back_pressure(self):
+        stream = ChunkStream(max_chunks=1)
+        self.assertTrue(stream.put(b'a'))
+        producer = threading.Thread(target=stream.put, args=(b'b',))
+        producer.start()
+        producer.join(timeout=0.3)
+        self.assertTrue(producer.is_alive())
+
+        self.assertEqual(stream.read(1), b'a')
+        producer.join(timeout=5)
+        self.assertFalse(producer.is_alive())
+        self.assertEqual(stream.read(1), b'b')
+
+    def test_chunk_stream_closed(self):
+        stream = ChunkStream(max_chunks=1)
+        self.assertTrue(stream.put(b'a'))
+        stream.close()
+        self.assertFalse(stream.put(b'b'))
+
+    def test_chunk_stream_error(self):
+        stream = ChunkStream()
+        stream.put(FileNotFoundError('missing'))
+        with self.assertRaises(FileNotFoundError):
+            stream.read()
+
+    def test_results_in_input_order(self):
+        paths = [self.write_file(f'{name}.txt', name * 3) for name in 'abcde']
+        results = [get() for _, get in iter_file_tasks(self.read_task, paths, prefetch=2)]
+        self.assertEqual(results, ['aaa', 'bbb', 'ccc', 'ddd', 'eee'])
+
+    def test_missing_file(self):
+        for _, get_result in iter_file_tasks(self.read_task, ['missing.txt'], prefetch=1):
+            with self.assertRaises(FileNotFoundError):
+                get_result()
+
+    def test_prefetch_with_jobs_rejected(self):
+        with self.assertRaises(ValueError):
+            next(iter_file_tasks(self.read_task, ['a.txt'], jobs=2, prefetch=1))
+        with redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                parse_args('usage', ['a.txt', '--jobs', '2', '--prefetch', '1'])
+
+    def test_next_file_read_while_current_one_is_read(self):
+        # Named pipes: a reader blocks in open() until the test writes to it
+        paths = [os.path.join(self.tmpdir.name, name) for name in ('a.gz', 'b.gz')]
+        for path in paths:
+            os.mkfifo(path)
+        pairs = iter_file_tasks(self.read_task, paths, prefetch=1)
+        _, get_first = next(pairs)
+
+        # Opening a pipe for writing without blocking fails until it has a reader
+        next_started = False
+        deadline = time.monotonic() + 5
+        while not next_started and time.monotonic() < deadline:
+            try:
+                next_fd = os.open(paths[1], os.O_WRONLY | os.O_NONBLOCK)
+            except OSError:
+                time.sleep(0.01)
+            else:
+                next_started = True
+                os.write(next_fd, gzip.compress(b'bbb'))
+                os.close(next_fd)
+
+        with open(paths[0], 'wb') as file:
+            file.write(gzip.compress(b'aaa'))
+        self.assertEqual(get_first(), 'aaa')
+        if not next_started:
+            with open(paths[1], 'wb') as file:
+                file.write(gzip.compress(b'bbb'))
+        self.assertEqual(next(pairs)[1](), 'bbb')
+        self.assertTrue(next_started)
+
+    def test_stop_early(self):
+        paths = [self.write_file(f'{i}.txt', 'x' * 10) for i in range(5)]
+        for _, get_result in iter_file_tasks(self.read_task, paths, prefetch=2):
+            self.assertEqual(get_result(), 'x' * 10)
+            break
+
+
+class TestExpandInputs(unittest.TestCase):
+    """Tests for directory, glob and manifest input expansion."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.tmpdir.cleanup)
+        self.root = self.tmpdir.name
+        os.makedirs(os.path.join(self.root, 'sub'))
+        for name, size in [('b.txt', 1), ('a.txt', 3), ('.hidden', 1),
+                           ('c.log', 2), (os.path.join('sub', 'd.txt'), 5)]:
+            with open(os.path.join(self.root, name), 'w', encoding='utf-8') as file:
+                file.write('1' * size)
+
+    def path(self, *names):
+        return os.path.join(self.root, *names)
+
+    def test_directory(self):
+        self.assertEqual(
+            expand_inputs([self.root]),
+            [self.path('a.txt'), self.path('b.txt'), self.path('c.log')],
+        )
+
+    def test_recursive_directory(self):
+        self.assertIn(self.path('sub', 'd.txt'), expand_inputs([self.root], recursive=True))
+
+    def test_directory_symlink_loop(self):
+        os.symlink(self.root, self.path('sub', 'loop'))
+        self.assertEqual(
+            expand_inputs([self.root], recursive=True),
+            [self.path('a.txt'), self.path('b.txt'), self.path('c.log'), self.path('sub', 'd.txt')],
+        )
+
+    def test_unreadable_directory_skipped(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(scan_directory(self.path('missing')), [])
+            self.assertEqual(scan_directory(self.path('b.txt')), [])
+        self.assertIn('Skipping directory', output.getvalue())
+
+    def test_glob(self):
+        self.assertEqual(
+            expand_inputs([self.path('*.txt')]),
+            [self.path('a.txt'), self.path('b.txt')],
+        )
+
+    def test_existing_path_with_glob_characters(self):
+        path = self.path('data[1].txt')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write('1')
+        self.assertEqual(expand_inputs([path]), [path])
+
+    def test_unmatched_glob_is_kept(self):
+        pattern = self.path('missing', '*.txt')
+        self.assertEqual(expand_inputs([pattern]), [pattern])
+
+    def test_missing_path_is_kept(self):
+        self.assertEqual(expand_inputs(['missing.txt']), ['missing.txt'])
+
+    def test_duplicates_dropped(self):
+        path = self.path('a.txt')
+        self.assertEqual(expand_inputs([path, path]), [path])
+
+    def test_largest_first(self):
+        paths = [self.path('b.txt'), 'missing.txt', self.path('a.txt'), self.path('c.log')]
+        self.assertEqual(
+            largest_first(paths),
+            [self.path('a.txt'), self.path('c.log'), self.path('b.txt'), 'missing.txt'],
+        )
+
+    def test_manifest(self):
+        manifest = self.path('inputs.lst')
+        with open(manifest, 'w', encoding='utf-8') as file:
+            file.write(f"# inputs\n{self.path('b.txt')}\n\n{self.path('sub')}\n")
+        args = parse_args('usage', ['--manifest', manifest])
+        self.assertEqual(args.filepaths, [self.path('b.txt'), self.path('sub', 'd.txt')])
+
+
+class TestRunMain(unittest.TestCase):
+    """Tests for the run_main function."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.tmpdir.cleanup)
+        self.input_path = os.path.join(self.tmpdir.name, 'words.txt')
+        with open(self.input_path, 'w', encoding='utf-8') as file:
+            file.write('b a b\n')
+        self.script = Script(
+            usage='usage',
+            process_fn=count_words.process_files,
+            format_file_fn=count_words.format_file,
+            combine_fn=count_words.combine_results,
+            output_path=os.path.join(self.tmpdir.name, 'results', 'Results.txt'),
+        )
+
+    def read_lines(self, path):
+        with open(path, 'r', encoding='utf-8') as file:
+            return file.read().splitlines()[:5]
+
+    def test_default_output_path(self):
+        with redirect_stdout(io.StringIO()):
+            run_main(self.script, [self.input_path])
+        path = os.path.join(self.tmpdir.name, 'results', 'Results_words.txt')
+        self.assertEqual(self.read_lines(path), ['# words.txt', 'Word\tCount', 'b\t2', 'a\t1',
+                                                 'Total\t3'])
+
+    def test_output_option(self):
+        path = os.path.join(self.tmpdir.name, 'custom.txt')
+        with redirect_stdout(io.StringIO()):
+            run_main(self.script, [self.input_path, '--output', path])
+        self.assertEqual(self.read_lines(path)[:3], ['# words.txt', 'Word\tCount', 'b\t2'])
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir.name, 'results')))
+
+    def test_merge_mismatched_options(self):
+        script = Script(
+            usage='usage',
+            process_fn=compute_statistics.process_files,
+            format_file_fn=compute_statistics.format_file,
+            combine_fn=compute_statistics.combine_results,
+            output_path=os.path.join(self.tmpdir.name, 'results', 'Stats.txt'),
+            invalid_lines=True,
+            extra_arguments=compute_statistics.EXTRA_ARGUMENTS,
+        )
+        inputs = []
+        for name in ('a.txt', 'b.txt'):
+            inputs.append(os.path.join(self.tmpdir.name, name))
+            with open(inputs[-1], 'w', encoding='utf-8') as file:
+                file.write('1\n2\n3\n')
+        parts = [os.path.join(self.tmpdir.name, f'part{shard}.txt') for shard in (1, 2)]
+        output = io.StringIO()
+        with redirect_stdout(output):
+            run_main(script, inputs + ['--shard', '1/2', '--metrics', 'Min', '--output', parts[0]])
+            run_main(script, inputs + ['--shard', '2/2', '--output', parts[1]])
+            with self.assertRaises(SystemExit):
+                run_main(script, ['merge'] + parts)
+        self.assertIn('options differ', output.getvalue())
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir.name, 'results')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,9 +2,13 @@
 
 # pylint: disable=missing-function-docstring
 
+import os
 import unittest
 
 from src.word_counter import (
+    WordCounts,
+    count_word_bytes,
+    count_word_lines,
     count_words,
     count_words_in_lines,
     get_word_frequencies,
@@ -95,5 +99,93 @@ class TestGetWordFrequencies(unittest.TestCase):
         self.assertEqual(result, {"hello": 1, "world": 1})
 
 
+class TestWordCounts(unittest.TestCase):
+    """Tests for the WordCounts store."""
+
+    def test_add(self):
+        counts = WordCounts()
+        counts.add("hello")
+        counts.add("world")
+        counts.add("hello", 2)
+        self.assertEqual(counts["hello"], 3)
+        self.assertEqual(len(counts), 2)
+        self.assertEqual(counts.total(), 4)
+
+    def test_first_seen_order(self):
+        counts = count_word_lines(["b a", "c b"])
+        self.assertEqual(list(counts.items()), [("b", 2), ("a", 1), ("c", 1)])
+
+    def test_equal_to_dict(self):
+        self.assertEqual(count_word_lines(["hello, hello!"]), {"hello": 2})
+
+    def test_iter_lines(self):
+        counts = count_word_lines(["a b a"])
+        self.assertEqual(list(counts.iter_lines()), ["a\t2", "b\t1"])
+
+    def test_add_to_existing(self):
+        counts = count_word_lines(["a"])
+        count_word_lines(["a b"], counts)
+        self.assertEqual(dict(counts.items()), {"a": 2, "b": 1})
+
+
+class TestCountWordBytes(unittest.TestCase):
+    """Tests for the byte-level count_word_bytes function."""
+
+    def assert_same_as_text(self, data, chunk_size=4):
+        chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+        self.assertEqual(
+            list(count_word_bytes(chunks).items()),
+            list(count_word_lines([data.decode('utf-8')]).items()),
+        )
+
+    def test_ascii(self):
+        self.assertEqual(count_word_bytes([b"hello, hello world!"]), {"hello": 2, "world": 1})
+
+    def test_chunks_split_words(self):
+        self.assertEqual(count_word_bytes([b"hel", b"lo\nwor", b"ld\nhello"]),
+                         {"hello": 2, "world": 1})
+
+    def test_non_ascii(self):
+        self.assertEqual(count_word_bytes(["caf\u00e9 caf\u00e9\n".encode()]),
+                         {"caf\u00e9": 2})
+
+    def test_chunks_split_utf8_characters(self):
+        self.assertEqual(count_word_bytes([b"caf\xc3", b"\xa9 a\n"]), {"caf\u00e9": 1, "a": 1})
+
+    def test_unicode_whitespace(self):
+        self.assert_same_as_text("a\u00a0b\u2003c\n".encode())
+
+    def test_ascii_separators(self):
+        self.assert_same_as_text(b"a\x1cb\x1fc\nd")
+
+    def test_no_line_breaks(self):
+        self.assert_same_as_text(b"one two\tthree one\rtwo  one", chunk_size=3)
+
+    def test_no_whitespace_across_chunks(self):
+        self.assertEqual(count_word_bytes([b"abc", b"def", b"gh i"]), {"abcdefgh": 1, "i": 1})
+
+    def test_non_ascii_without_line_breaks(self):
+        data = "\u00fc\u00e9 caf\u00e9 \u00fc\u00e9\u00a0x".encode()
+        self.assert_same_as_text(data, chunk_size=3)
+
+    def test_mixed_blocks_keep_order(self):
+        self.assert_same_as_text("b a\n\u00fc b\na \u00fc\n".encode(), chunk_size=3)
+
+    def test_data_results(self):
+        data_dir = os.path.join(os.path.dirname(__file__), '..', 'data', 'P3')
+        for case in range(1, 6):
+            with self.subTest(case=case):
+                expected = {}
+                results_path = os.path.join(data_dir, f'TC{case}.Results.txt')
+                with open(results_path, 'r', encoding='utf-8') as file:
+                    for line in file:
+                        word, word_count = line.rstrip('\n').split('\t')
+                        if word not in ('Row Labels', '(blank)', 'Grand Total'):
+                            expected[word] = int(word_count)
+
+                with open(os.path.join(data_dir, f'TC{case}.txt'), 'rb') as file:
+                    self.assertEqual(count_word_bytes([file.read()]), expected)
+
+
 if __name__ == '__main__':
     unittest.main()